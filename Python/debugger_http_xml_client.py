@@ -5,6 +5,11 @@ This module provides functionality to test an XML server by sending an HTTP GET
 and displaying the response. It is designed to work with an XML server that responds 
 to GET requests with XML data.
 
+It also provides a load-generation mode that sends GET requests from N concurrent
+workers over reused keep-alive connections, on threads or on asyncio, and reports
+the throughput and latency distribution, and a streaming parse mode that yields
+matching elements of large XML documents while they are still being received.
+
 Attributes
 ----------
 xml_server_host : str
@@ -14,14 +19,46 @@ xml_server_port : int
 xml_server_path : str
     Path for the GET request to the XML server.
 
+Classes
+-------
+ConnectionPool
+    A pool of reusable keep-alive HTTP connections.
+LoadTestResult
+    Outcome of a load test: request count, errors, elapsed time and latencies.
+
 Functions
 ---------
 test_xml_server(host: str, port: int, path: str)
     Sends a GET request to the specified XML server and prints the response.
+load_test(host: str, port: int, path: str, concurrency: int, requests: int, duration: float, mode: str)
+    Sends GET requests from concurrent workers and collects their latencies.
+print_report(result: LoadTestResult)
+    Prints requests/sec, latency percentiles and a latency histogram.
+stream_xml_elements(host: str, port: int, path: str, match: str, chunk_size: int) -> Iterator[Element]
+    Parses the response incrementally and yields the matching elements as they arrive.
+
+Usage
+-----
+    $ python debugger_http_xml_client.py                      # single request
+    $ python debugger_http_xml_client.py --load --concurrency 50 --duration 10 --mode asyncio
+    $ python debugger_http_xml_client.py --path /synthetic_xml --stream data/record
 
 """
 
+import argparse
+import asyncio
 import http.client
+import math
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import xml.etree.ElementTree as ET
+import zlib
+
+LOAD_MODES = ('threads', 'asyncio')
+# Number of bytes read from the response and fed to the parser at once
+STREAM_CHUNK_SIZE = 64 * 1024
 
 def test_xml_server(host: str, port: int, path: str) -> None:
     """
@@ -55,12 +92,436 @@ def test_xml_server(host: str, port: int, path: str) -> None:
 
     connection.close()
 
+
+class ConnectionPool:
+    """
+    A pool of keep-alive HTTP connections to one server.
+
+    Connections are created on demand up to `size` and handed back with release,
+    so each request reuses an open TCP connection instead of setting up a new one.
+
+    Methods
+    -------
+    acquire() -> http.client.HTTPConnection
+        Takes a connection from the pool, waiting if all are in use.
+    release(connection: http.client.HTTPConnection, reuse: bool = True)
+        Returns a connection, or discards it if it is no longer usable.
+    close()
+        Closes all idle connections.
+
+    """
+
+    def __init__(self, host: str, port: int, size: int, timeout: float = 30.0):
+        """
+        Parameters
+        ----------
+        host : str
+            The hostname or IP address of the server.
+        port : int
+            The port number of the server.
+        size : int
+            The maximum number of open connections.
+        timeout : float, optional
+            Socket timeout in seconds. Defaults to 30.
+
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self) -> http.client.HTTPConnection:
+        """Take an idle connection, or open a new one if the pool is not full."""
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def release(self, connection: http.client.HTTPConnection, reuse: bool = True) -> None:
+        """Return a connection to the pool, closing it if it cannot be reused."""
+        if reuse:
+            self._idle.put(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class LoadTestResult(NamedTuple):
+    """
+    Outcome of a load test.
+
+    Attributes
+    ----------
+    requests : int
+        Number of completed requests, including failed ones.
+    errors : int
+        Number of requests that failed or did not return 200.
+    elapsed : float
+        Wall-clock duration of the test in seconds.
+    latencies : list of float
+        Latency of every successful request in seconds.
+    """
+    requests: int
+    errors: int
+    elapsed: float
+    latencies: List[float]
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Return the latency percentile (nearest rank) in seconds."""
+        if not self.latencies:
+            return math.nan
+        ordered = sorted(self.latencies)
+        rank = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+
+class _Budget:
+    """Thread-safe stop condition by request count and/or deadline."""
+
+    def __init__(self, requests: Optional[int], duration: Optional[float]):
+        self._remaining = requests
+        self._deadline = None if duration is None else time.perf_counter() + duration
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return False
+        if self._remaining is None:
+            return True
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+
+def _thread_worker(pool: ConnectionPool, path: str, headers: Dict[str, str], budget: _Budget,
+                   latencies: List[float], errors: List[int]) -> None:
+    """Send requests over pooled connections until the budget is used up."""
+    while budget.take():
+        connection = pool.acquire()
+        reuse = True
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            reuse = not response.will_close
+            if response.status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException):
+            reuse = False
+            errors.append(0)
+        finally:
+            pool.release(connection, reuse)
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool]:
+    """Read one HTTP/1.1 response, returning its status and whether the connection stays open."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('iso-8859-1').split('\r\n')
+    version, status = lines[0].split()[:2]
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip().lower()
+
+    keep_alive = headers.get('connection') != 'close' and version == 'HTTP/1.1'
+    if 'chunked' in headers.get('transfer-encoding', ''):
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif status not in ('204', '304'):
+        await reader.read()
+        keep_alive = False
+    return int(status), keep_alive
+
+
+async def _async_worker(host: str, port: int, path: str, headers: Dict[str, str], budget: _Budget,
+                        latencies: List[float], errors: List[int]) -> None:
+    """Send requests over one keep-alive connection, reconnecting when it closes."""
+    request = [f"GET {path} HTTP/1.1", f"Host: {host}:{port}"]
+    request.extend(f"{name}: {value}" for name, value in headers.items())
+    request = ('\r\n'.join(request) + '\r\n\r\n').encode('iso-8859-1')
+
+    reader = writer = None
+    while budget.take():
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            status, keep_alive = await _read_response(reader)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            keep_alive = False
+            errors.append(0)
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+        # Let the other workers run even if every read completed synchronously
+        await asyncio.sleep(0)
+    if writer is not None:
+        writer.close()
+
+
+def load_test(
+    host: str,
+    port: int,
+    path: str,
+    concurrency: int = 10,
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+    mode: str = 'threads',
+    headers: Optional[Dict[str, str]] = None,
+) -> LoadTestResult:
+    """
+    Sends GET requests from concurrent workers over keep-alive connections.
+
+    Runs until `requests` requests were sent or `duration` seconds passed,
+    whichever comes first. Without either, 1000 requests are sent.
+
+    Parameters
+    ----------
+    host : str
+        The hostname or IP address of the XML server.
+    port : int
+        The port number on which the XML server is listening.
+    path : str
+        The path to request from the XML server.
+    concurrency : int, optional
+        The number of concurrent workers, each with its own connection. Defaults to 10.
+    requests : int, optional
+        The total number of requests to send.
+    duration : float, optional
+        The test duration in seconds.
+    mode : str, optional
+        'threads' (http.client with a ConnectionPool) or 'asyncio'. Defaults to 'threads'.
+    headers : dict, optional
+        Extra request headers, e.g. {'Accept-Encoding': 'gzip'}.
+
+    Returns
+    -------
+    LoadTestResult
+        The request count, errors, elapsed time and latencies.
+
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of {LOAD_MODES}")
+    if requests is None and duration is None:
+        requests = 1000
+    headers = headers or {}
+    budget = _Budget(requests, duration)
+    latencies: List[float] = []
+    errors: List[int] = []
+
+    start = time.perf_counter()
+    if mode == 'threads':
+        pool = ConnectionPool(host, port, concurrency)
+        workers = [
+            threading.Thread(target=_thread_worker, args=(pool, path, headers, budget, latencies, errors))
+            for _ in range(concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        pool.close()
+    else:
+        async def run():
+            await asyncio.gather(*(
+                _async_worker(host, port, path, headers, budget, latencies, errors)
+                for _ in range(concurrency)
+            ))
+        asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    return LoadTestResult(len(latencies) + len(errors), len(errors), elapsed, latencies)
+
+
+def print_report(result: LoadTestResult, buckets: int = 10) -> None:
+    """
+    Prints throughput, latency percentiles and a logarithmic latency histogram.
+
+    Parameters
+    ----------
+    result : LoadTestResult
+        The outcome of load_test.
+    buckets : int, optional
+        The number of histogram buckets. Defaults to 10.
+
+    """
+    print(f"Requests: {result.requests} ({result.errors} errors) in {result.elapsed:.2f} s")
+    print(f"Throughput: {result.requests_per_second:,.0f} requests/s")
+    if not result.latencies:
+        return
+    for percent in (50, 95, 99):
+        print(f"p{percent}: {result.percentile(percent) * 1000:.2f} ms")
+
+    low, high = min(result.latencies), max(result.latencies)
+    if high <= low:
+        return
+    ratio = (high / low) ** (1 / buckets)
+    counts = [0] * buckets
+    for latency in result.latencies:
+        index = min(buckets - 1, int(math.log(latency / low, ratio)))
+        counts[index] += 1
+    widest = max(counts)
+    print("Latency histogram:")
+    for index, count in enumerate(counts):
+        upper = low * ratio ** (index + 1) * 1000
+        bar = '#' * round(40 * count / widest)
+        print(f"  <= {upper:9.2f} ms {count:8d} {bar}")
+
+
+def stream_xml_elements(
+    host: str,
+    port: int,
+    path: str,
+    match: str,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[ET.Element]:
+    """
+    Sends a GET request and yields the matching XML elements as they arrive.
+
+    The response is read in chunks and fed to an XMLPullParser, so the first
+    elements are available before the document is complete. Every element that
+    has been yielded, or that lies outside any match, is cleared and detached from
+    its parent, so memory use does not grow with the document size. Copy anything
+    needed from a yielded element before advancing the iterator.
+
+    Parameters
+    ----------
+    host : str
+        The hostname or IP address of the XML server.
+    port : int
+        The port number on which the XML server is listening.
+    path : str
+        The path to request from the XML server.
+    match : str
+        A tag name, matched at any depth (e.g. 'record'), or a slash-separated
+        path from the root element (e.g. 'data/record').
+    chunk_size : int, optional
+        The number of bytes read at once. Defaults to STREAM_CHUNK_SIZE.
+
+    Yields
+    ------
+    xml.etree.ElementTree.Element
+        The complete matching elements, in document order.
+
+    Raises
+    ------
+    http.client.HTTPException
+        If the server does not answer with status 200.
+
+    """
+    match_path = match.strip('/').split('/') if '/' in match else None
+    connection = http.client.HTTPConnection(host, port)
+    try:
+        connection.request("GET", path, headers={'Accept-Encoding': 'gzip'})
+        response = connection.getresponse()
+        if response.status != 200:
+            raise http.client.HTTPException(f"Unexpected response status {response.status}")
+        decompressor = None
+        if response.getheader('Content-Encoding', '').lower() == 'gzip':
+            decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        tags: List[str] = []
+        parents: List[ET.Element] = []
+        matched_depth = 0  # number of open matched elements around the current one
+
+        while True:
+            raw = response.read(chunk_size)
+            data = raw
+            if decompressor is not None:
+                # A compressed chunk may decompress to nothing (e.g. only the gzip header)
+                data = decompressor.decompress(raw) if raw else decompressor.flush()
+            if data:
+                parser.feed(data)
+            if not raw:
+                parser.close()
+
+            for event, element in parser.read_events():
+                if event == 'start':
+                    tags.append(element.tag)
+                    parents.append(element)
+                    if tags == match_path if match_path else element.tag == match:
+                        matched_depth += 1
+                    continue
+
+                is_match = tags == match_path if match_path else element.tag == match
+                tags.pop()
+                parents.pop()
+                if is_match:
+                    matched_depth -= 1
+                    yield element
+                if matched_depth == 0:
+                    # Done with this subtree, drop it to keep the tree small
+                    element.clear()
+                    if parents:
+                        parents[-1].remove(element)
+
+            if not raw:
+                break
+    finally:
+        connection.close()
+
+
 if __name__ == "__main__":
     # Example usage
     xml_server_host = "127.0.0.1"
     xml_server_port = 5000
     xml_server_path = "/get_xml_data"
 
-    test_xml_server(xml_server_host, xml_server_port, xml_server_path)
-
+    parser = argparse.ArgumentParser(description="Test or load-test an XML server.")
+    parser.add_argument('--host', default=xml_server_host)
+    parser.add_argument('--port', type=int, default=xml_server_port)
+    parser.add_argument('--path', default=xml_server_path)
+    parser.add_argument('--load', action='store_true', help="Run a load test instead of a single request.")
+    parser.add_argument('--concurrency', type=int, default=10, help="Number of concurrent workers.")
+    parser.add_argument('--requests', type=int, default=None, help="Total number of requests.")
+    parser.add_argument('--duration', type=float, default=None, help="Test duration in seconds.")
+    parser.add_argument('--mode', choices=LOAD_MODES, default='threads')
+    parser.add_argument('--stream', metavar='MATCH', help="Parse incrementally and count elements matching MATCH.")
+    args = parser.parse_args()
 
+    if args.stream:
+        start = time.perf_counter()
+        count = 0
+        for element in stream_xml_elements(args.host, args.port, args.path, args.stream):
+            if count == 0:
+                print(f"First element after {(time.perf_counter() - start) * 1000:.1f} ms: "
+                      f"{ET.tostring(element, encoding='unicode').strip()}")
+            count += 1
+        print(f"{count} elements in {time.perf_counter() - start:.2f} s")
+    elif args.load:
+        load_result = load_test(args.host, args.port, args.path, args.concurrency,
+                                args.requests, args.duration, args.mode)
+        print_report(load_result)
+    else:
+        test_xml_server(args.host, args.port, args.path)
@@ -9,50 +9,401 @@ that responds to GET requests with XML content. Intended just for quick XML clie
 testing.
 
 Classes:
+    CachedPayload: A response body pre-encoded and pre-gzipped, with its ETag.
+    PayloadCache: Keeps one CachedPayload per route.
+    StaticFile: A response body sent from disk with sendfile.
+    Route: What a path is served with.
+    RouteTable: Maps request paths to payloads, static files or generators.
     XMLRequestHandler: Handles incoming HTTP requests.
+    KeepAliveXMLRequestHandler: XMLRequestHandler with HTTP/1.1 keep-alive.
     HttpXmlServer: Manages the HTTP server.
 
 Functions:
+    generate_synthetic_xml: Yields a synthetic XML document of a given size.
+    handle_async_connection: Serves one connection in the asyncio mode.
     run_server: Starts the XML server based on provided configuration.
 
+Serving modes:
+    single:    the standard single-threaded HTTPServer, one request per connection.
+    threading: ThreadingHTTPServer, one thread per connection, HTTP/1.1 keep-alive.
+    asyncio:   an asyncio server, thousands of concurrent keep-alive connections
+               in one thread.
+    All modes share XMLRequestHandler's routing.
+
+Payloads are encoded and gzipped once per route and served with an ETag, so
+repeated GETs are answered from memory, or with 304 Not Modified for clients
+sending If-None-Match.
+
+Routes are registered in XMLRequestHandler.routes. Besides small cached payloads,
+a path can serve a static file, sent with sendfile, or the output of a generator,
+streamed with chunked transfer encoding, so multi-megabyte documents are served
+with flat memory:
+    XMLRequestHandler.routes.add_file('/feed.xml', 'feed.xml')
+    XMLRequestHandler.routes.add_generator('/big.xml', lambda params: generate_synthetic_xml(10**8))
+The built-in /synthetic_xml route takes the document size in bytes as a query
+parameter, e.g. /synthetic_xml?size=50000000.
+
 Usage:
     Run the script to start the server. It listens on localhost:5000 by default.
     Access http://localhost:5000/get_xml_data to retrieve XML data.
+    Pass the serving mode as the first argument, e.g. `python debugger_http_xml_server.py asyncio`.
 
 """
 
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import asyncio
+import gzip
+import hashlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
 import logging
-from typing import Dict
+import os
+import sys
+import threading
+from typing import Callable, Dict, Iterator, Mapping, NamedTuple, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+SERVER_MODES = ('single', 'threading', 'asyncio')
+# Listen backlog, so bursts of new connections are not refused
+REQUEST_QUEUE_SIZE = 1024
+# Seconds an idle keep-alive connection is kept open
+KEEP_ALIVE_TIMEOUT = 30
+# Default size and chunk size of the synthetic XML document, in bytes
+SYNTHETIC_SIZE = 10 * 1024 * 1024
+SYNTHETIC_CHUNK_SIZE = 64 * 1024
+
+class CachedPayload(NamedTuple):
+    """A response body in its identity and gzip encodings, with their ETags."""
+    body: bytes
+    gzipped: bytes
+    etag: str
+    gzip_etag: str
+
+    @classmethod
+    def from_text(cls, text: str) -> 'CachedPayload':
+        """Encode, compress and fingerprint a payload once."""
+        body = text.encode()
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        return cls(body, gzip.compress(body, mtime=0), f'"{digest}"', f'"{digest}-gzip"')
+
+
+class PayloadCache:
+    """
+    Thread-safe cache of CachedPayload objects, built on first use of a route.
+
+    Methods
+    -------
+    get(path: str, factory: Callable[[], str]) -> CachedPayload
+        Returns the cached payload of a route, creating it with factory if needed.
+    invalidate(path: str = None)
+        Drops one route, or all routes, so the payload is rebuilt on the next request.
+
+    """
+
+    def __init__(self):
+        self._payloads: Dict[str, CachedPayload] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, factory: Callable[[], str]) -> CachedPayload:
+        """Return the payload of a route, building it on first use."""
+        payload = self._payloads.get(path)
+        if payload is None:
+            with self._lock:
+                payload = self._payloads.get(path)
+                if payload is None:
+                    payload = self._payloads[path] = CachedPayload.from_text(factory())
+        return payload
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop a cached route, or all of them."""
+        with self._lock:
+            if path is None:
+                self._payloads.clear()
+            else:
+                self._payloads.pop(path, None)
+
+
+class StaticFile(NamedTuple):
+    """A response body to be sent from a file on disk."""
+    path: str
+    size: int
+
+
+class Route(NamedTuple):
+    """
+    What a path is served with.
+
+    Attributes
+    ----------
+    kind : str
+        'payload' for a small cached document, 'file' for a static file or
+        'generator' for a streamed document.
+    target : str or callable
+        The payload factory (returns str), the file path, or the generator factory
+        (takes the query parameters, returns an iterator of bytes).
+    content_type : str
+        The Content-type of the response.
+    """
+    kind: str
+    target: Union[str, Callable]
+    content_type: str = 'application/xml'
+
+
+class RouteTable:
+    """
+    Maps request paths to the responses served for them.
+
+    Methods
+    -------
+    add_payload(path: str, factory: Callable[[], str], content_type: str)
+        Serves a small document, built once and cached encoded and gzipped.
+    add_file(path: str, file_path: str, content_type: str)
+        Serves a static file with sendfile.
+    add_generator(path: str, factory: Callable[[dict], Iterator[bytes]], content_type: str)
+        Streams the chunks yielded by a generator with chunked transfer encoding.
+    resolve(path: str) -> Route or None
+        Returns the route registered for a path.
+
+    """
+
+    def __init__(self):
+        self._routes: Dict[str, Route] = {}
+
+    def add_payload(self, path: str, factory: Callable[[], str],
+                    content_type: str = 'application/xml') -> None:
+        """Register a cached payload route."""
+        self._routes[path] = Route('payload', factory, content_type)
+
+    def add_file(self, path: str, file_path: str, content_type: str = 'application/xml') -> None:
+        """Register a static file route."""
+        self._routes[path] = Route('file', file_path, content_type)
+
+    def add_generator(self, path: str, factory: Callable[[Dict[str, str]], Iterator[bytes]],
+                      content_type: str = 'application/xml') -> None:
+        """Register a streamed generator route."""
+        self._routes[path] = Route('generator', factory, content_type)
+
+    def resolve(self, path: str) -> Optional[Route]:
+        """Return the route of a path (without query string), or None."""
+        return self._routes.get(path)
+
+
+def generate_synthetic_xml(size: int = SYNTHETIC_SIZE,
+                           chunk_size: int = SYNTHETIC_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Yield a synthetic XML document of roughly `size` bytes in chunks.
+
+    The document is a <data> element with numbered <record> children, built one
+    chunk at a time so memory use does not depend on the document size.
+
+    Parameters
+    ----------
+    size : int, optional
+        Approximate document size in bytes. Defaults to SYNTHETIC_SIZE.
+    chunk_size : int, optional
+        Approximate size of each yielded chunk. Defaults to SYNTHETIC_CHUNK_SIZE.
+
+    Yields
+    ------
+    bytes
+        Consecutive parts of the document.
+
+    """
+    head = b'<?xml version="1.0" encoding="UTF-8"?>\n<data>\n'
+    tail = b'</data>\n'
+    yield head
+    written = len(head) + len(tail)
+    record_id = 0
+    while written < size:
+        records = []
+        chunk_length = 0
+        while chunk_length < chunk_size and written + chunk_length < size:
+            record = (f'  <record id="{record_id}"><value>{record_id % 1000}</value>'
+                      f'<status>OK</status></record>\n').encode()
+            records.append(record)
+            chunk_length += len(record)
+            record_id += 1
+        written += chunk_length
+        yield b''.join(records)
+    yield tail
+
+
+def _synthetic_route(params: Dict[str, str]) -> Iterator[bytes]:
+    """Generator route serving generate_synthetic_xml, sized by the `size` query parameter."""
+    return generate_synthetic_xml(int(params.get('size', SYNTHETIC_SIZE)))
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Check whether an Accept-Encoding header allows gzip."""
+    for coding in (accept_encoding or '').split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '').lower() not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
 
 class XMLRequestHandler(BaseHTTPRequestHandler):
     """
     A request handler class for the HTTP XML server.
 
+    Attributes
+    ----------
+    routes : RouteTable
+        The paths served and what they are served with.
+    payloads : PayloadCache
+        Pre-encoded and pre-gzipped payloads of the payload routes.
+    log_payloads : bool
+        Log every response body at debug level. Off by default, as formatting the
+        payload for each request is expensive.
+
     Methods
     -------
     do_GET(self):
         Handles the GET request to the server.
-    create_xml_data(self) -> str:
+    do_HEAD(self):
+        Handles the HEAD request to the server.
+    build_response(method: str, path: str, request_headers: Mapping) -> tuple:
+        Routes a request to its status, headers and body, independent of the transport.
+    create_xml_data() -> str:
         Generates XML data as a string.
 
     """
 
+    routes = RouteTable()
+    payloads = PayloadCache()
+    log_payloads = False
+
     def do_GET(self):
         """Handle the GET request to the server."""
-        if self.path == '/get_xml_data':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/xml')
+        self._respond('GET')
+
+    def do_HEAD(self):
+        """Handle the HEAD request to the server."""
+        self._respond('HEAD')
+
+    def _respond(self, method: str):
+        """Send the response built by build_response."""
+        status, headers, body = self.build_response(method, self.path, self.headers)
+        if status >= 400:
+            self.send_error(status, headers.get('X-Reason'))
+            logging.debug("Error while trying to send data")
+            return
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        if isinstance(body, (bytes, StaticFile)):
             self.end_headers()
             logging.debug("Header send")
-            xml_data = self.create_xml_data()
-            self.wfile.write(xml_data.encode())
-            logging.debug(f"Data send {xml_data}")
+            if method == 'HEAD':
+                return
+            if isinstance(body, StaticFile):
+                with open(body.path, 'rb') as file:
+                    self.connection.sendfile(file)
+            elif body:
+                self.wfile.write(body)
+                if self.log_payloads:
+                    logging.debug(f"Data send {body}")
+            return
+
+        # Generator body of unknown length: chunked on HTTP/1.1, else until close
+        chunked = self.protocol_version == 'HTTP/1.1' and self.request_version == 'HTTP/1.1'
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
         else:
-            self.send_error(404, "Not Found")
-            logging.debug("Error while trying to send data")
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        logging.debug("Header send")
+        if method == 'HEAD':
+            body.close()
+            return
+        for chunk in body:
+            if not chunk:
+                continue
+            self.wfile.write(b'%X\r\n%s\r\n' % (len(chunk), chunk) if chunked else chunk)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+
+    @classmethod
+    def build_response(
+        cls,
+        method: str,
+        path: str,
+        request_headers: Optional[Mapping[str, str]] = None,
+    ) -> Tuple[int, Dict[str, str], Union[bytes, StaticFile, Iterator[bytes]]]:
+        """
+        Route a request to its response.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method of the request.
+        path : str
+            The request path.
+        request_headers : Mapping, optional
+            The request headers, looked up by lower-case name. Used for
+            If-None-Match and Accept-Encoding.
+
+        Returns
+        -------
+        tuple
+            The status code, the response headers and the response body. The body
+            is bytes, a StaticFile to send from disk, or an iterator of bytes chunks
+            for generator routes (sent without Content-Length).
+
+        """
+        if method not in ('GET', 'HEAD'):
+            return HTTPStatus.NOT_IMPLEMENTED, {'X-Reason': "Unsupported method"}, b''
+        url = urlsplit(path)
+        route = cls.routes.resolve(url.path)
+        if route is None:
+            return HTTPStatus.NOT_FOUND, {'X-Reason': "Not Found"}, b''
+
+        if route.kind == 'file':
+            try:
+                size = os.path.getsize(route.target)
+            except OSError:
+                return HTTPStatus.NOT_FOUND, {'X-Reason': "File Not Found"}, b''
+            headers = {'Content-type': route.content_type, 'Content-Length': str(size)}
+            return HTTPStatus.OK, headers, StaticFile(route.target, size)
+
+        if route.kind == 'generator':
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            try:
+                body = route.target(params)
+            except ValueError as e:
+                return HTTPStatus.BAD_REQUEST, {'X-Reason': str(e)}, b''
+            return HTTPStatus.OK, {'Content-type': route.content_type}, body
+
+        request_headers = request_headers or {}
+        payload = cls.payloads.get(url.path, route.target)
+        if _accepts_gzip(request_headers.get('accept-encoding')):
+            body, etag = payload.gzipped, payload.gzip_etag
+            headers = {'Content-type': route.content_type, 'Content-Encoding': 'gzip'}
+        else:
+            body, etag = payload.body, payload.etag
+            headers = {'Content-type': route.content_type}
+        headers.update({'ETag': etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'})
+
+        if _etag_matches(request_headers.get('if-none-match'), etag):
+            return HTTPStatus.NOT_MODIFIED, headers, b''
+        headers['Content-Length'] = str(len(body))
+        return HTTPStatus.OK, headers, body
 
-    def create_xml_data(self) -> str:
+    def log_message(self, format, *args):
+        """Log requests at debug level instead of writing every one to stderr."""
+        logging.debug(format % args)
+
+    @staticmethod
+    def create_xml_data() -> str:
         """Generate XML data as a string."""
         xml_data = """<?xml version="1.0" encoding="UTF-8"?>
         <data>
@@ -61,6 +412,116 @@ class XMLRequestHandler(BaseHTTPRequestHandler):
         </data>"""
         return xml_data
 
+
+XMLRequestHandler.routes.add_payload('/get_xml_data', XMLRequestHandler.create_xml_data)
+XMLRequestHandler.routes.add_generator('/synthetic_xml', _synthetic_route)
+
+
+async def handle_async_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Serve HTTP/1.1 requests on one connection of the asyncio server mode.
+
+    Requests are routed with XMLRequestHandler.build_response. The connection is
+    kept open until the client closes it or asks for `Connection: close`.
+
+    Parameters
+    ----------
+    reader : asyncio.StreamReader
+        The connection's input stream.
+    writer : asyncio.StreamWriter
+        The connection's output stream.
+
+    """
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                break
+
+            lines = head.decode('iso-8859-1').split('\r\n')
+            try:
+                method, path, version = lines[0].split()
+            except ValueError:
+                writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                break
+            request_headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    request_headers[name.strip().lower()] = value.strip()
+
+            # Discard any request body so the next request starts at the right place
+            length = int(request_headers.get('content-length', 0) or 0)
+            if length:
+                await reader.readexactly(length)
+
+            connection = request_headers.get('connection', '').lower()
+            keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+            status, headers, body = XMLRequestHandler.build_response(method, path, request_headers)
+            if status >= 400:
+                body = f"{status.value} {headers.pop('X-Reason', status.phrase)}".encode()
+                headers = {'Content-type': 'text/plain', 'Content-Length': str(len(body))}
+            streamed = not isinstance(body, (bytes, StaticFile))
+            if streamed:
+                if version == 'HTTP/1.1':
+                    headers['Transfer-Encoding'] = 'chunked'
+                else:
+                    # No length and no chunking: the end of the body is the end of the connection
+                    keep_alive = False
+            headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+
+            response = [f"HTTP/1.1 {status.value} {status.phrase}"]
+            response.extend(f"{name}: {value}" for name, value in headers.items())
+            writer.write(('\r\n'.join(response) + '\r\n\r\n').encode('iso-8859-1'))
+            if method == 'HEAD':
+                if streamed:
+                    body.close()
+            elif isinstance(body, StaticFile):
+                await writer.drain()
+                with open(body.path, 'rb') as file:
+                    await asyncio.get_running_loop().sendfile(writer.transport, file)
+            elif streamed:
+                chunked = version == 'HTTP/1.1'
+                for chunk in body:
+                    if not chunk:
+                        continue
+                    writer.write(b'%X\r\n%s\r\n' % (len(chunk), chunk) if chunked else chunk)
+                    await writer.drain()
+                if chunked:
+                    writer.write(b'0\r\n\r\n')
+            else:
+                writer.write(body)
+            await writer.drain()
+            logging.debug(f"{method} {path} {status.value}")
+
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+class KeepAliveXMLRequestHandler(XMLRequestHandler):
+    """
+    XMLRequestHandler speaking HTTP/1.1, so clients can reuse their connection.
+
+    Only suitable for the threading mode: in the single-threaded server one idle
+    keep-alive client would block all the others.
+    """
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body are separate writes; with Nagle on, delayed ACKs stall each reply
+    disable_nagle_algorithm = True
+
+
+class _ThreadingXmlServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with a larger listen backlog."""
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+
 class HttpXmlServer:
     """
     A class to manage the HTTP XML server.
@@ -71,8 +532,10 @@ class HttpXmlServer:
         Hostname of the server.
     port : int
         Port number of the server.
+    mode : str
+        Serving mode, one of SERVER_MODES.
     http_server : HTTPServer or None
-        Instance of the HTTPServer.
+        Instance of the HTTPServer (single and threading modes).
 
     Methods
     -------
@@ -83,7 +546,7 @@ class HttpXmlServer:
 
     """
 
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, mode: str = 'single'):
         """
         Initialize the HttpXmlServer with host and port.
 
@@ -93,36 +556,79 @@ class HttpXmlServer:
             Hostname for the server.
         port : int
             Port number for the server.
+        mode : str, optional
+            Serving mode, one of SERVER_MODES. Defaults to 'single'.
 
         """
+        if mode not in SERVER_MODES:
+            raise ValueError(f"Unknown server mode '{mode}', expected one of {SERVER_MODES}")
         self.host = host
         self.port = port
+        self.mode = mode
         self.http_server = None
+        self._loop = None
+        self._stopped = None
+        self._connections = {}  # asyncio mode: handler task -> writer of each open connection
 
     def start_server(self):
         """Starts the HTTP XML server."""
         try:
-            self.http_server = HTTPServer((self.host, self.port), XMLRequestHandler)
-            logging.info(f"Server listening on {self.host}:{self.port}")
+            if self.mode == 'asyncio':
+                asyncio.run(self._serve_async())
+                return
+            if self.mode == 'threading':
+                self.http_server = _ThreadingXmlServer((self.host, self.port), KeepAliveXMLRequestHandler)
+            else:
+                self.http_server = HTTPServer((self.host, self.port), XMLRequestHandler)
+            logging.info(f"Server listening on {self.host}:{self.port} ({self.mode})")
             self.http_server.serve_forever()
         except Exception as e:
             logging.error(f"Error running XML server: {e}")
 
+    async def _serve_async(self):
+        """Runs the asyncio server until stop_server is called."""
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        server = await asyncio.start_server(self._handle_async_connection, self.host, self.port,
+                                            backlog=REQUEST_QUEUE_SIZE)
+        logging.info(f"Server listening on {self.host}:{self.port} ({self.mode})")
+        async with server:
+            await self._stopped.wait()
+            server.close()
+            # Close idle keep-alive connections so their handlers end instead of being cancelled
+            for writer in self._connections.values():
+                writer.close()
+            if self._connections:
+                await asyncio.wait(list(self._connections), timeout=KEEP_ALIVE_TIMEOUT)
+
+    async def _handle_async_connection(self, reader: asyncio.StreamReader,
+                                       writer: asyncio.StreamWriter) -> None:
+        """Serve one connection, tracking it so stop_server can close it."""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            await handle_async_connection(reader, writer)
+        finally:
+            del self._connections[task]
+
     def stop_server(self):
         """Stops the HTTP XML server."""
         if self.http_server:
             self.http_server.shutdown()
             self.http_server.server_close()
             logging.info("Server stopped.")
+        elif self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stopped.set)
+            logging.info("Server stopped.")
 
-def run_server(xml_server_config: Dict[str, int]) -> None:
+def run_server(xml_server_config: Dict[str, Union[str, int]]) -> None:
     """
     Starts the HTTP XML server based on provided configuration.
 
     Parameters
     ----------
     xml_server_config : dict
-        Configuration for the XML server, including 'host' and 'port'.
+        Configuration for the XML server, including 'host', 'port' and optionally 'mode'.
 
     """
     xml_server = HttpXmlServer(**xml_server_config)
@@ -139,5 +645,7 @@ def run_server(xml_server_config: Dict[str, int]) -> None:
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s [%(levelname)s] %(message)s')
     xml_server_config = {'host': 'localhost', 'port': 5000}
+    if len(sys.argv) > 1:
+        xml_server_config['mode'] = sys.argv[1]
     run_server(xml_server_config)
 
@@ -2,23 +2,110 @@
 """
 Script to detect the encoding of a file using the chardet library.
 
+Reading a whole multi-GB file into memory just to detect its encoding is slow,
+so besides the full read there are two bounded-cost modes: a streaming mode that
+feeds chunks to chardet's UniversalDetector and stops as soon as it is confident
+enough, and a sampling mode that only looks at the head, middle and tail of the
+file through mmap.
+
+Once the encoding is known, transcode_to_utf8 rewrites a file as UTF-8 in fixed-size
+chunks, so parsers with a fast UTF-8 path (pyarrow, pandas' C parser) can read it.
+
 Dependencies
 ------------
-chardet : Python library for character encoding detection.
+chardet : Python library for character encoding detection (version 7 or newer).
 
 Constants
 ---------
 INPUT_FILE : str
     Path to the file for which to detect the encoding.
+CHUNK_SIZE : int
+    Number of bytes fed to the detector at once in streaming mode.
+SAMPLE_SIZE : int
+    Number of bytes read per sampled block in sampling mode.
+CONFIDENCE_THRESHOLD : float
+    Confidence at which streaming detection stops early.
+FALLBACK_ENCODING : str
+    Encoding transcoded from when none is detected (normalizer.ENCODING).
+MODES : tuple
+    The supported detection modes, see detect_encoding.
+CACHE_FILE : str
+    Path of the on-disk cache used by detect_encodings.
+CACHE_SIZE : int
+    Maximum number of entries kept in the cache (least recently used are evicted).
+FINGERPRINT_SIZE : int
+    Number of bytes per block hashed to recognize unchanged files.
+UTF8_SUFFIX : str
+    Inserted before the extension of transcoded files.
+SOURCE_RECORD_SUFFIX : str
+    Appended to a transcoded file's name for the record of its source.
+
+Usage
+-----
+Detect the encodings of all files in a directory on all cores, reusing cached
+results for files that did not change:
+    $ python encoding_detector.py exports/ --workers 8
+
+Transcode them to UTF-8 (written as `<root>.utf8<ext>`; ASCII and UTF-8 files are
+left as they are) and normalize the directory, which reads the UTF-8 copy in place
+of each transcoded source:
+    $ python encoding_detector.py 'exports/*.csv' --to-utf8
+    $ python normalizer.py exports/ --encoding utf-8 --engine pyarrow
 """
 
+# Standard library imports
+import argparse
+import codecs
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import copy
+import glob
+import hashlib
+import json
+import mmap
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
 # Third party imports
 import chardet
+from chardet import UniversalDetector
 
 # Constants
 INPUT_FILE: str = 'replace-me.csv'
+CHUNK_SIZE: int = 1024 * 1024
+SAMPLE_SIZE: int = 64 * 1024
+CONFIDENCE_THRESHOLD: float = 0.95
+FALLBACK_ENCODING: str = 'ISO-8859-1'
+MODES: tuple = ('full', 'stream', 'sample')
+CACHE_FILE: str = '.encoding_cache.json'
+CACHE_SIZE: int = 100_000
+FINGERPRINT_SIZE: int = 4096
+UTF8_SUFFIX: str = '.utf8'
+SOURCE_RECORD_SUFFIX: str = '.source.json'
 
-def detect_encoding(file_path: str) -> str:
+
+class DetectionResult(NamedTuple):
+    """
+    Result of an encoding detection.
+
+    Attributes
+    ----------
+    encoding : str or None
+        Detected encoding, or None if it could not be determined.
+    confidence : float
+        Detector confidence between 0 and 1.
+    bytes_read : int
+        Number of bytes of the file that were examined.
+    error : str, optional
+        The error message if the file could not be read.
+    """
+    encoding: Optional[str]
+    confidence: float
+    bytes_read: int
+    error: Optional[str] = None
+
+
+def detect_encoding(file_path: str, mode: str = 'full') -> str:
     """
     Detect the encoding of a file.
 
@@ -26,6 +113,9 @@ def detect_encoding(file_path: str) -> str:
     ----------
     file_path : str
         Path to the file for which to detect the encoding.
+    mode : str, optional
+        'full' reads the whole file, 'stream' uses detect_encoding_streaming and
+        'sample' uses detect_encoding_sampled. Defaults to 'full'.
 
     Returns
     -------
@@ -33,11 +123,610 @@ def detect_encoding(file_path: str) -> str:
         Detected encoding of the file.
     
     """
+    if mode == 'stream':
+        return detect_encoding_streaming(file_path).encoding
+    if mode == 'sample':
+        return detect_encoding_sampled(file_path).encoding
+    if mode != 'full':
+        raise ValueError(f"Unknown mode '{mode}', expected one of {MODES}")
+
     with open(file_path, 'rb') as file:
-        result = chardet.detect(file.read())
+        data = file.read()
+    result = chardet.detect(data, max_bytes=max(len(data), 1))
 
     return result['encoding']
 
+
+def detect_encoding_streaming(
+    file_path: str,
+    chunk_size: int = CHUNK_SIZE,
+    threshold: float = CONFIDENCE_THRESHOLD,
+    max_bytes: Optional[int] = None,
+) -> DetectionResult:
+    """
+    Detect the encoding of a file by feeding it to the detector chunk by chunk.
+
+    Reading stops once the confidence reaches `threshold`, checked whenever the data
+    read has doubled, or after `max_bytes`. The detector buffers what it is fed, so
+    memory use is bounded by `max_bytes`. An 'ascii' guess never stops reading
+    early, since non-ASCII bytes may still follow.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file for which to detect the encoding.
+    chunk_size : int, optional
+        Number of bytes fed to the detector at once. Defaults to CHUNK_SIZE.
+    threshold : float, optional
+        Confidence at which to stop reading. Defaults to CONFIDENCE_THRESHOLD.
+    max_bytes : int, optional
+        Upper bound on the number of bytes read. Defaults to the whole file.
+
+    Returns
+    -------
+    DetectionResult
+        Detected encoding, confidence and number of bytes examined.
+
+    """
+    # chardet examines only its own max_bytes (200 KB by default) of what it is fed
+    limit = max_bytes if max_bytes is not None else os.path.getsize(file_path)
+    detector = UniversalDetector(max_bytes=max(limit, 1))
+    bytes_read = 0
+    next_peek = 0
+
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(min(chunk_size, limit - bytes_read)), b''):
+            detector.feed(chunk)
+            bytes_read += len(chunk)
+            if bytes_read >= limit:
+                break
+            if bytes_read < next_peek:
+                continue
+            # Peek at the current guess without finalizing the real detector; each
+            # peek analyses everything fed so far, so peek whenever the data doubles
+            next_peek = 2 * bytes_read
+            guess = copy.deepcopy(detector).close()
+            if guess['encoding'] != 'ascii' and guess['confidence'] >= threshold:
+                break
+
+    result = detector.close()
+    return DetectionResult(result['encoding'], result['confidence'], bytes_read)
+
+
+def detect_encoding_sampled(file_path: str, sample_size: int = SAMPLE_SIZE) -> DetectionResult:
+    """
+    Detect the encoding of a file from blocks at its head, middle and tail.
+
+    The blocks are read through mmap and the middle and tail blocks start at a line
+    boundary, so multi-byte characters are not split. The cost does not depend on
+    the file size, at the price of missing characters that only occur elsewhere.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file for which to detect the encoding.
+    sample_size : int, optional
+        Number of bytes per sampled block. Defaults to SAMPLE_SIZE.
+
+    Returns
+    -------
+    DetectionResult
+        Detected encoding, confidence and number of bytes read.
+
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return DetectionResult(None, 0.0, 0)
+
+    detector = UniversalDetector(max_bytes=min(size, 3 * sample_size))
+    bytes_read = 0
+
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if size <= 3 * sample_size:
+            starts = [0]
+            sample_size = size
+        else:
+            starts = [0, size // 2, size - sample_size]
+
+        for start in starts:
+            if start:
+                # Skip to the start of the next line
+                newline = data.find(b'\n', start, start + sample_size)
+                start = newline + 1 if newline != -1 else start
+            block = data[start:start + sample_size]
+            detector.feed(block)
+            bytes_read += len(block)
+
+    result = detector.close()
+    return DetectionResult(result['encoding'], result['confidence'], bytes_read)
+
+
+def detect_ascii_or_utf8(file_path: str, chunk_size: int = CHUNK_SIZE) -> Optional[DetectionResult]:
+    """
+    Check whether a file is pure ASCII or valid UTF-8, without chardet.
+
+    Both checks run in C over fixed-size chunks, which is much faster than chardet.
+    The file is read until the first byte that is not valid UTF-8.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file to check.
+    chunk_size : int, optional
+        Number of bytes checked at once. Defaults to CHUNK_SIZE.
+
+    Returns
+    -------
+    DetectionResult or None
+        'ascii' or 'utf-8' with confidence 1.0, or None if the file is neither.
+
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    ascii_only = True
+    bytes_read = 0
+
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            bytes_read += len(chunk)
+            if ascii_only and chunk.isascii():
+                continue
+            ascii_only = False
+            try:
+                decoder.decode(chunk)
+            except UnicodeDecodeError:
+                return None
+        try:
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return None
+
+    return DetectionResult('ascii' if ascii_only else 'utf-8', 1.0, bytes_read)
+
+
+def _fingerprint(file_path: str, size: int) -> str:
+    """Hash small blocks at the head, middle and tail of a file."""
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(file_path, 'rb') as file:
+        for start in sorted({0, max(0, size // 2 - FINGERPRINT_SIZE // 2), max(0, size - FINGERPRINT_SIZE)}):
+            file.seek(start)
+            digest.update(file.read(FINGERPRINT_SIZE))
+    return digest.hexdigest()
+
+
+class EncodingCache:
+    """
+    On-disk cache of detection results with least-recently-used eviction.
+
+    Entries are keyed by absolute path and are valid while the size, mtime and a
+    hash of sampled content blocks are unchanged. Each entry records the detection
+    mode; it answers requests for the same or a weaker mode ('full' is strongest,
+    then 'stream', then 'sample'), so asking for a stronger mode detects again.
+
+    Attributes
+    ----------
+    path : str
+        Path of the JSON cache file.
+    max_entries : int
+        Maximum number of entries kept.
+
+    Methods
+    -------
+    get(file_path: str, mode: str) -> DetectionResult or None
+        Returns the cached result if the file did not change and the mode suffices.
+    put(file_path: str, result: DetectionResult, mode: str)
+        Stores a result, evicting the least recently used entries.
+    save()
+        Writes the cache back to disk.
+
+    """
+
+    def __init__(self, path: str = CACHE_FILE, max_entries: int = CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        try:
+            with open(path) as file:
+                self.entries.update(json.load(file))
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    def get(self, file_path: str, mode: str = 'stream') -> Optional[DetectionResult]:
+        """Return the cached result for an unchanged file detected in at least `mode`, or None."""
+        key = os.path.abspath(file_path)
+        entry = self.entries.get(key)
+        if entry is None or entry.get('mode') not in MODES or MODES.index(entry['mode']) > MODES.index(mode):
+            return None
+        stat = os.stat(file_path)
+        if (entry['size'], entry['mtime_ns']) != (stat.st_size, stat.st_mtime_ns) \
+                or entry['fingerprint'] != _fingerprint(file_path, stat.st_size):
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return DetectionResult(*entry['result'])
+
+    def put(self, file_path: str, result: DetectionResult, mode: str = 'stream') -> None:
+        """Store the result of detecting the current state of a file in `mode`."""
+        key = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        self.entries[key] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'fingerprint': _fingerprint(file_path, stat.st_size),
+            'mode': mode,
+            'result': list(result),
+        }
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self) -> None:
+        """Write the cache to disk atomically."""
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.entries, file)
+        os.replace(temporary, self.path)
+
+
+def _detect_file(file_path: str, mode: str) -> DetectionResult:
+    """
+    Detect one file in a worker process, trying the ASCII/UTF-8 check first.
+
+    That check reads the whole file, so when it fails an 'ascii' or 'utf-8' guess
+    from chardet (which may only have seen part of the file) is known to be wrong
+    and is reported as undetected.
+    """
+    result = detect_ascii_or_utf8(file_path)
+    if result is not None:
+        return result
+    if mode == 'sample':
+        result = detect_encoding_sampled(file_path)
+    elif mode == 'stream':
+        result = detect_encoding_streaming(file_path)
+    else:
+        with open(file_path, 'rb') as file:
+            data = file.read()
+        detected = chardet.detect(data, max_bytes=max(len(data), 1))
+        result = DetectionResult(detected['encoding'], detected['confidence'], len(data))
+    if result.encoding is not None and codecs.lookup(result.encoding).name in ('ascii', 'utf-8'):
+        return result._replace(encoding=None, confidence=0.0)
+    return result
+
+
+def _collect_files(sources: Iterable[str]) -> List[str]:
+    """Expand files, directories and glob patterns into a sorted list of files."""
+    files = set()
+    for source in sources:
+        pattern = os.path.join(source, '*') if os.path.isdir(source) else source
+        files.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(files)
+
+
+def detect_encodings(
+    sources: Union[str, Iterable[str]],
+    workers: Optional[int] = None,
+    mode: str = 'stream',
+    cache_file: Optional[str] = CACHE_FILE,
+) -> Dict[str, DetectionResult]:
+    """
+    Detect the encodings of many files in parallel, with a persistent cache.
+
+    Files answered by the cache are not read beyond a few small fingerprint blocks.
+    The others are checked for pure ASCII/UTF-8 first and only handed to chardet
+    if that fails, in a pool of worker processes.
+
+    Parameters
+    ----------
+    sources : str or iterable of str
+        Files, directories or glob patterns.
+    workers : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    mode : str, optional
+        The chardet mode for files that are not ASCII/UTF-8, see detect_encoding.
+        Defaults to 'stream'.
+    cache_file : str, optional
+        Path of the cache file, or None to disable caching. Defaults to CACHE_FILE.
+
+    Returns
+    -------
+    dict
+        File path to DetectionResult. Files that could not be read get a result
+        with encoding None and the error message; they are not cached.
+
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of {MODES}")
+    if isinstance(sources, str):
+        sources = [sources]
+
+    cache = EncodingCache(cache_file) if cache_file else None
+    results: Dict[str, DetectionResult] = {}
+    pending = []
+    for file_path in _collect_files(sources):
+        try:
+            cached = cache.get(file_path, mode) if cache else None
+        except OSError:
+            cached = None  # vanished or unreadable, reported by the detection below
+        if cached is not None:
+            results[file_path] = cached
+        else:
+            pending.append(file_path)
+
+    try:
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_detect_file, file_path, mode) for file_path in pending]
+                for file_path, future in zip(pending, futures):
+                    try:
+                        result = future.result()
+                        if cache:
+                            cache.put(file_path, result, mode)
+                    except Exception as e:
+                        result = DetectionResult(None, 0.0, 0, str(e))
+                        print(f"{file_path}: error: {e}")
+                    results[file_path] = result
+    finally:
+        if cache:
+            cache.save()
+
+    return results
+
+
+class TranscodeResult(NamedTuple):
+    """
+    Result of transcoding one file to UTF-8.
+
+    Attributes
+    ----------
+    source : str
+        The input file.
+    output : str
+        The UTF-8 file to read instead; the source itself if it already was UTF-8.
+    encoding : str or None
+        The encoding the source was decoded from.
+    bytes_written : int
+        Size of the output written, 0 if the source or a cached output was reused.
+    cached : bool
+        True if an up-to-date output from an earlier run was reused.
+    error : str, optional
+        The error message if the file could not be transcoded.
+    """
+    source: str
+    output: str
+    encoding: Optional[str]
+    bytes_written: int
+    cached: bool
+    error: Optional[str] = None
+
+
+def _choose_encoding(file_path: str, result: DetectionResult, fallback_encoding: Optional[str]) -> str:
+    """Return the detected encoding, or fallback_encoding if there is none."""
+    if result.encoding is not None:
+        return result.encoding
+    if fallback_encoding is None:
+        raise ValueError(f"Could not detect the encoding of '{file_path}'")
+    return fallback_encoding
+
+
+def _utf8_path(file_path: str, output_dir: Optional[str] = None) -> str:
+    """Return where the UTF-8 copy of a file goes: `<root>.utf8<ext>`, optionally in output_dir."""
+    root, ext = os.path.splitext(file_path)
+    if output_dir:
+        root = os.path.join(output_dir, os.path.basename(root))
+    return f'{root}{UTF8_SUFFIX}{ext}'
+
+
+def _source_state(file_path: str) -> Dict[str, Union[int, str]]:
+    """Describe the current state of a file, as EncodingCache does."""
+    stat = os.stat(file_path)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'fingerprint': _fingerprint(file_path, stat.st_size),
+    }
+
+
+def transcode_to_utf8(
+    file_path: str,
+    output: Optional[str] = None,
+    encoding: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    errors: str = 'strict',
+    mode: str = 'stream',
+    fallback_encoding: Optional[str] = FALLBACK_ENCODING,
+) -> TranscodeResult:
+    """
+    Transcode a file to UTF-8 in fixed-size chunks.
+
+    The source is read `chunk_size` bytes at a time through an incremental decoder,
+    which keeps multi-byte sequences split across chunks intact, so memory use is
+    bounded by the chunk size. The output is written to a temporary file and renamed
+    into place, next to a `<output>.source.json` record of the source's size, mtime
+    and fingerprint; while those match, later calls reuse the output without reading
+    the source. ASCII and UTF-8 sources need no copy and are returned as they are.
+
+    Parameters
+    ----------
+    file_path : str
+        The file to transcode.
+    output : str, optional
+        The UTF-8 file to write. Defaults to `<root>.utf8<ext>` next to the source.
+    encoding : str, optional
+        The source encoding, e.g. from detect_encoding. Detected if None.
+    chunk_size : int, optional
+        Number of bytes decoded at once. Defaults to CHUNK_SIZE.
+    errors : str, optional
+        The codec error handler, e.g. 'replace'. Defaults to 'strict'.
+    mode : str, optional
+        The detection mode used when encoding is None, see detect_encoding.
+        Defaults to 'stream'.
+    fallback_encoding : str, optional
+        The encoding used when none is detected, or None to raise instead. Defaults to FALLBACK_ENCODING.
+
+    Returns
+    -------
+    TranscodeResult
+        Where to read the UTF-8 data from.
+
+    Raises
+    ------
+    ValueError
+        If the encoding cannot be determined and fallback_encoding is None.
+    UnicodeDecodeError
+        If the source is not valid in the encoding and errors is 'strict'.
+    """
+    if encoding is None:
+        encoding = _choose_encoding(file_path, _detect_file(file_path, mode), fallback_encoding)
+    if codecs.lookup(encoding).name in ('ascii', 'utf-8'):
+        return TranscodeResult(file_path, file_path, encoding, 0, False)
+
+    output = output or _utf8_path(file_path)
+    record = f'{output}{SOURCE_RECORD_SUFFIX}'
+    state = dict(_source_state(file_path), encoding=encoding)
+    try:
+        with open(record) as file:
+            if json.load(file) == state and os.path.exists(output):
+                return TranscodeResult(file_path, output, encoding, 0, True)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    temporary = f'{output}.tmp'
+    written = 0
+    try:
+        with open(file_path, 'rb') as source, open(temporary, 'wb') as target:
+            while True:
+                chunk = source.read(chunk_size)
+                data = decoder.decode(chunk, final=not chunk).encode('utf-8')
+                target.write(data)
+                written += len(data)
+                if not chunk:
+                    break
+        os.replace(temporary, output)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    with open(record, 'w') as file:
+        json.dump(state, file)
+    return TranscodeResult(file_path, output, encoding, written, False)
+
+
+def _transcode_file(file_path: str, encoding: Optional[str], output_dir: Optional[str],
+                    chunk_size: int, errors: str) -> TranscodeResult:
+    """Transcode one file in a worker process, reporting errors in the result."""
+    try:
+        return transcode_to_utf8(file_path, _utf8_path(file_path, output_dir), encoding, chunk_size, errors)
+    except (OSError, UnicodeError, LookupError, ValueError) as e:
+        return TranscodeResult(file_path, file_path, encoding, 0, False, str(e))
+
+
+def transcode_files(
+    sources: Union[str, Iterable[str]],
+    workers: Optional[int] = None,
+    output_dir: Optional[str] = None,
+    mode: str = 'stream',
+    cache_file: Optional[str] = CACHE_FILE,
+    chunk_size: int = CHUNK_SIZE,
+    errors: str = 'strict',
+    fallback_encoding: Optional[str] = FALLBACK_ENCODING,
+) -> Dict[str, TranscodeResult]:
+    """
+    Transcode many files to UTF-8 in parallel, reusing up-to-date outputs.
+
+    Encodings come from detect_encodings (and its cache); files are then converted
+    by transcode_to_utf8 in a pool of worker processes. Outputs of earlier runs,
+    e.g. `<root>.utf8<ext>` files, are not treated as sources.
+
+    Parameters
+    ----------
+    sources : str or iterable of str
+        Files, directories or glob patterns.
+    workers : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    output_dir : str, optional
+        Directory for the UTF-8 files. Defaults to next to each source.
+    mode : str, optional
+        The detection mode, see detect_encodings. Defaults to 'stream'.
+    cache_file : str, optional
+        Path of the detection cache file, or None to disable it. Defaults to CACHE_FILE.
+    chunk_size : int, optional
+        Number of bytes decoded at once. Defaults to CHUNK_SIZE.
+    errors : str, optional
+        The codec error handler. Defaults to 'strict'.
+    fallback_encoding : str, optional
+        The encoding used when none is detected, or None to report such files as
+        errors. Defaults to FALLBACK_ENCODING.
+
+    Returns
+    -------
+    dict
+        File path to TranscodeResult.
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    files = [path for path in _collect_files(sources)
+             if not path.endswith(SOURCE_RECORD_SUFFIX)
+             and not os.path.splitext(path)[0].endswith(UTF8_SUFFIX)]
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    detected = detect_encodings(files, workers, mode, cache_file) if files else {}
+
+    results: Dict[str, TranscodeResult] = {}
+    encodings: Dict[str, str] = {}
+    for path in files:
+        try:
+            if detected[path].error:
+                raise ValueError(detected[path].error)
+            encodings[path] = _choose_encoding(path, detected[path], fallback_encoding)
+        except ValueError as e:
+            results[path] = TranscodeResult(path, path, detected[path].encoding, 0, False, str(e))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_transcode_file, path, encoding, output_dir, chunk_size, errors): path
+            for path, encoding in encodings.items()
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
 if __name__ == "__main__":
-    encoding_result = detect_encoding(INPUT_FILE)
-    print(f"The detected encoding is: {encoding_result}")
+    parser = argparse.ArgumentParser(description="Detect the character encoding of files.")
+    parser.add_argument('sources', nargs='*', help="Files, directories or glob patterns. Defaults to INPUT_FILE.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes.")
+    parser.add_argument('--mode', choices=MODES, default='stream')
+    parser.add_argument('--cache', default=CACHE_FILE, help="Cache file path.")
+    parser.add_argument('--no-cache', action='store_true', help="Do not read or write the cache.")
+    parser.add_argument('--to-utf8', action='store_true', help="Transcode the files to UTF-8.")
+    parser.add_argument('--output-dir', help="Directory for the UTF-8 files. Defaults to next to the sources.")
+    parser.add_argument('--fallback-encoding', default=FALLBACK_ENCODING,
+                        help="Encoding used when none is detected.")
+    args = parser.parse_args()
+
+    if args.sources and args.to_utf8:
+        transcoded = transcode_files(args.sources, args.workers, args.output_dir, args.mode,
+                                     None if args.no_cache else args.cache,
+                                     fallback_encoding=args.fallback_encoding)
+        for path, result in sorted(transcoded.items()):
+            if result.error:
+                print(f"{path}: error: {result.error}")
+            elif result.output == path:
+                print(f"{path}: already {result.encoding}")
+            else:
+                status = "up to date" if result.cached else f"{result.bytes_written} bytes written"
+                print(f"{path}: {result.encoding} -> {result.output} ({status})")
+    elif args.sources:
+        detected = detect_encodings(args.sources, args.workers, args.mode,
+                                    None if args.no_cache else args.cache)
+        for path, result in detected.items():
+            if not result.error:
+                print(f"{path}: {result.encoding} (confidence {result.confidence:.2f})")
+    else:
+        encoding_result = detect_encoding(INPUT_FILE)
+        print(f"The detected encoding is: {encoding_result}")
+
+        for name, detect in (('Streaming', detect_encoding_streaming), ('Sampled', detect_encoding_sampled)):
+            result = detect(INPUT_FILE)
+            print(f"{name}: {result.encoding} (confidence {result.confidence:.2f}, "
+                  f"{result.bytes_read} bytes read)")
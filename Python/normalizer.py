@@ -15,11 +15,52 @@ DELIMITER : str
     The delimiter used in CSV files.
 INTERVAL : str
     The resampling interval for timestamp interpolation.
+TIMESTAMP_COLUMN : str
+    The column holding the sample timestamps.
+COMPRESSOR_COLUMN : str
+    The column telling whether the heat pump compressor is running.
+CHUNK_SIZE : int
+    The number of CSV rows parsed at once by the streaming path.
+BLOCK_SIZE : int
+    The number of bytes parsed at once by the incremental path.
+STRATEGIES : tuple
+    The supported choices of interpolation method, see interpolate_timestamp.
+OUTPUT_FORMATS : tuple
+    The supported output file formats, see write_interpolated.
+RESAMPLERS : tuple
+    The supported resampling engines, see interpolate_timestamp.
+WEATHER_METHODS : tuple
+    The supported ways of aligning hourly weather onto the grid, see join_weather.
+WEATHER_TOLERANCE : str
+    How old the last hourly value may be for an 'asof' weather join.
+UTF8_SUFFIX : str
+    Marks the UTF-8 copies written by encoding_detector.transcode_to_utf8.
+
+Classes
+-------
+CsvSchema
+    Column dtypes, timestamp format and parser engine for reading the CSV files.
 
 Functions
 ---------
-interpolate_timestamp(name: str) -> pd.DataFrame
+interpolate_timestamp(name: str, strategy: str, schema: CsvSchema, time_column: bool,
+                      resampler: str) -> pd.DataFrame
     Interpolate timestamps in CSV data.
+write_interpolated(df: pd.DataFrame, output: str) -> None
+    Save interpolated data as CSV, Parquet or Feather depending on the extension.
+interpolate_timestamp_streaming(name: str, output: str, chunksize: int, schema: CsvSchema) -> int
+    Interpolate timestamps chunk by chunk, writing the result incrementally.
+interpolate_timestamp_incremental(name: str, checkpoint: str, schema: CsvSchema) -> int
+    Normalize only the rows appended since the previous run.
+normalize_batch(source: str, workers: int, strategy: str, use_hash: bool, force: bool,
+                output_format: str, schema: CsvSchema, resampler: str) -> list
+    Normalize many CSV files in parallel, skipping the up-to-date ones.
+weather_frame(data: dict, timezone: str) -> pd.DataFrame
+    Load Open-Meteo hourly unixtime arrays into a timestamp-indexed frame.
+join_weather(frames: dict, weather: dict, method: str, timezone: str, tolerance: str) -> dict
+    Align hourly weather onto the normalized series of many sites.
+benchmark_resampling(rows: tuple, columns: int) -> None
+    Time the pandas and NumPy resamplers against each other.
 
 Usage
 -----
@@ -28,9 +69,41 @@ For example:
     if __name__ == "__main__":
         interpolated_df = interpolate_timestamp(SOURCE_NAME)
         interpolated_df.to_csv(f'{SOURCE_NAME}_interpolated{CSV_EXTENSION}', index=False, sep=DELIMITER)
+
+Parsing is much faster with explicit dtypes and timestamp format, and columnar
+output is much faster to read back:
+    schema = CsvSchema(timestamp_format='%d.%m.%Y %H:%M:%S', engine='pyarrow')
+    df = interpolate_timestamp(SOURCE_NAME, schema=schema, time_column=False)
+    write_interpolated(df, f'{SOURCE_NAME}_interpolated.parquet')
+
+For files too large to fit in memory, stream them instead:
+    interpolate_timestamp_streaming(SOURCE_NAME, f'{SOURCE_NAME}_interpolated.parquet')
+
+The 'numpy' resampler gives the same frame as the default 'pandas' one; linear
+interpolation is several times faster (run the module with --benchmark to measure):
+    df = interpolate_timestamp(SOURCE_NAME, resampler='numpy')
+
+To correlate with outdoor conditions, join openmeteo_client responses per site:
+    joined = join_weather({'site': df}, {'site': weather_data}, timezone='Europe/Prague')
+
+To normalize a whole directory of exports on all cores, run the module with a
+directory or glob pattern:
+    $ python normalizer.py 'exports/tc_*.csv' --workers 8
 """
 
+# Standard library imports
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import hashlib
+import io
+import json
+import os
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
 # Third-party imports
+import numpy as np
 import pandas as pd
 
 # Constants
@@ -39,42 +112,151 @@ ENCODING: str = 'ISO-8859-1'
 DELIMITER: str = ';'
 INTERVAL: str = '10S'
 TIMESTAMP_COLUMN: str = 'CAS'
+COMPRESSOR_COLUMN: str = 'TC1 ot.komp.'
+CHUNK_SIZE: int = 500_000
+BLOCK_SIZE: int = 64 * 1024 * 1024
+STRATEGIES: tuple = ('global', 'segmented')
+OUTPUT_FORMATS: tuple = ('csv', 'parquet', 'feather')
+RESAMPLERS: tuple = ('pandas', 'numpy')
+WEATHER_METHODS: tuple = ('linear', 'asof')
+WEATHER_TOLERANCE: str = '1h'
+UTF8_SUFFIX: str = '.utf8'
+
+
+class CsvSchema(NamedTuple):
+    """
+    How to parse the source CSV files.
+
+    Attributes
+    ----------
+    dtypes : dict, optional
+        Column name to dtype, e.g. {'TC1 ot.komp.': 'float32'}. Inferred if None.
+    timestamp_format : str, optional
+        strftime format of the TIMESTAMP_COLUMN values. Inferred (slowly) if None.
+    engine : str, optional
+        'pyarrow' to parse with the multithreaded pyarrow CSV reader (requires
+        pyarrow), or None for the default pandas parser.
+    encoding : str, optional
+        The file encoding. Defaults to ENCODING. Files transcoded with
+        encoding_detector.transcode_to_utf8 are read fastest as 'utf-8'.
+    """
+    dtypes: Optional[Dict[str, str]] = None
+    timestamp_format: Optional[str] = None
+    engine: Optional[str] = None
+    encoding: Optional[str] = None
+
 
+def _read_csv(name: str, schema: CsvSchema) -> pd.DataFrame:
+    """Read the whole CSV file according to the schema."""
+    if schema.engine != 'pyarrow':
+        return pd.read_csv(f'{name}.csv', delimiter=DELIMITER, encoding=schema.encoding or ENCODING,
+                           skiprows=1, dtype=schema.dtypes)
 
-def interpolate_timestamp(name: str) -> pd.DataFrame:
+    # Optional dependency, only needed for the pyarrow engine
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    column_types = {column: pa.from_numpy_dtype(np.dtype(dtype))
+                    for column, dtype in (schema.dtypes or {}).items()}
+    timestamp_parsers = None
+    if schema.timestamp_format:
+        column_types[TIMESTAMP_COLUMN] = pa.timestamp('ns')
+        timestamp_parsers = [schema.timestamp_format]
+
+    try:
+        table = pa_csv.read_csv(
+            f'{name}.csv',
+            read_options=pa_csv.ReadOptions(skip_rows=1, encoding=schema.encoding or ENCODING),
+            parse_options=pa_csv.ParseOptions(delimiter=DELIMITER),
+            convert_options=pa_csv.ConvertOptions(column_types=column_types,
+                                                  timestamp_parsers=timestamp_parsers),
+        )
+    except pa.ArrowInvalid as e:
+        # pyarrow reports missing files as ArrowInvalid, keep the pandas behaviour
+        if not os.path.exists(f'{name}.csv'):
+            raise FileNotFoundError(f'{name}.csv') from e
+        raise
+    return table.to_pandas()
+
+
+def _prepare_frame(df: pd.DataFrame, timestamp_format: Optional[str] = None,
+                   time_column: bool = True) -> pd.DataFrame:
+    """Parse the timestamps, add the 'Time' column and index the frame by timestamp."""
+    # Convert 'CAS' column to datetime type; pyarrow parses ISO timestamps to
+    # datetime64[s], so use nanoseconds whichever engine read the file
+    df[TIMESTAMP_COLUMN] = pd.to_datetime(df[TIMESTAMP_COLUMN], format=timestamp_format).dt.as_unit('ns')
+
+    # Extract the time in HH:MM:SS format
+    if time_column:
+        df['Time'] = df[TIMESTAMP_COLUMN].dt.strftime('%H:%M:%S')
+
+    # Set the 'CAS' column as the index
+    df.set_index(TIMESTAMP_COLUMN, inplace=True)
+    return df
+
+
+def interpolate_timestamp(
+    name: str,
+    strategy: str = 'global',
+    schema: Optional[CsvSchema] = None,
+    time_column: bool = True,
+    resampler: str = 'pandas',
+) -> pd.DataFrame:
     """
     Interpolate timestamps in CSV data to achieve a uniform 10-second interval.
 
+    With the 'global' strategy one method is used for the whole file: linear
+    interpolation if the compressor never runs, forward fill otherwise. With the
+    'segmented' strategy the method is chosen per row, so compressor-on runs are
+    forward filled and compressor-off runs are interpolated linearly. A row counts
+    as running when the last sample at or before it has TC1 ot.komp. > 0.
+
     Parameters
     ----------
     name : str
         The base name for CSV files (excluding extension).
+    strategy : str, optional
+        One of STRATEGIES. Defaults to 'global'.
+    schema : CsvSchema, optional
+        Dtypes, timestamp format and parser engine. Defaults to inferring everything.
+    time_column : bool, optional
+        Add the derived 'Time' (HH:MM:SS) text column. Defaults to True.
+    resampler : str, optional
+        One of RESAMPLERS. 'numpy' computes the same frame with np.searchsorted and
+        vectorized interpolation instead of DataFrame.resample. Defaults to 'pandas'.
 
     Returns
     -------
     pandas.DataFrame
         Transformed DataFrame with a uniform 10-second interval.
     """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}', expected one of {STRATEGIES}")
+    if resampler not in RESAMPLERS:
+        raise ValueError(f"Unknown resampler '{resampler}', expected one of {RESAMPLERS}")
+    schema = schema or CsvSchema()
+
     try:
         # Read the CSV file
-        df = pd.read_csv(f'{name}.csv', delimiter=DELIMITER, encoding=ENCODING, skiprows=1)
+        df = _read_csv(name, schema)
 
-        # Convert 'CAS' column to datetime type
-        df[TIMESTAMP_COLUMN] = pd.to_datetime(df[TIMESTAMP_COLUMN])
+        df = _prepare_frame(df, schema.timestamp_format, time_column)
 
-        # Extract the time in HH:MM:SS format
-        df['Time'] = df[TIMESTAMP_COLUMN].dt.strftime('%H:%M:%S')
+        if strategy == 'segmented':
+            df_filled = _resample(df, 'ffill', resampler)
+            df_linear = _resample(df, 'linear', resampler)
 
-        # Set the 'CAS' column as the index
-        df.set_index(TIMESTAMP_COLUMN, inplace=True)
+            # Mask of compressor-on rows, the runs of False are the off segments
+            running = df_filled[COMPRESSOR_COLUMN] > 0
+            df_interpolated = df_filled.where(running, df_linear, axis=0)
 
         # Check if heat pump is running (TC1 ot.komp. > 0)
-        if (df['TC1 ot.komp.'] <= 0).all():
+        elif (df[COMPRESSOR_COLUMN] <= 0).all():
             # Linear interpolation for timestamps
-            df_interpolated = df.resample(INTERVAL).interpolate(method='linear')
+            df_interpolated = _resample(df, 'linear', resampler)
         else:
             # Copy values to achieve a uniform 10-second interval
-            df_interpolated = df.resample(INTERVAL).ffill()
+            df_interpolated = _resample(df, 'ffill', resampler)
 
         return df_interpolated
 
@@ -83,12 +265,864 @@ def interpolate_timestamp(name: str) -> pd.DataFrame:
         return pd.DataFrame()  # Return an empty DataFrame in case of error
 
 
+def _resample(df: pd.DataFrame, method: str, resampler: str = 'pandas') -> pd.DataFrame:
+    """Resample a prepared frame onto the INTERVAL grid by forward fill or linear interpolation."""
+    if resampler == 'numpy':
+        return _resample_numpy(df, method)
+    resampled = df.resample(INTERVAL)
+    return resampled.ffill() if method == 'ffill' else resampled.interpolate(method='linear')
+
+
+def _grid(index: pd.DatetimeIndex) -> Tuple[int, pd.DatetimeIndex]:
+    """Return the first INTERVAL grid point in nanoseconds and the grid spanning a sorted index."""
+    step = pd.Timedelta(INTERVAL).value
+    stamps = index.as_unit('ns').asi8
+    start, end = stamps[0] // step * step, stamps[-1] // step * step
+    grid_index = pd.date_range(pd.Timestamp(start, tz=index.tz), periods=(end - start) // step + 1,
+                               freq=INTERVAL, name=index.name)
+    return start, grid_index
+
+
+def _take_rows(df: pd.DataFrame, rows: np.ndarray, index: pd.DatetimeIndex,
+               interpolate: bool = False) -> pd.DataFrame:
+    """
+    Gather source rows onto the grid, one 2-D take per dtype; row -1 means missing.
+
+    Missing rows follow the reindex rules: integer columns become float64, boolean
+    columns become object, and the gaps hold NaN. With `interpolate`, the gaps of the
+    float columns are then filled as by DataFrame.interpolate(method='linear').
+    """
+    missing = rows < 0
+    any_missing = bool(missing.any())
+    if any_missing:
+        rows = np.where(missing, 0, rows)
+    frames = []
+    for dtype, names in df.columns.groupby(df.dtypes).items():
+        # Take along the transposed block so the result has pandas' column-major
+        # layout and the frame below wraps it without copying
+        taken = df[list(names)].to_numpy().T[:, rows]
+        if any_missing:
+            if dtype.kind in 'iu':
+                taken = taken.astype(np.float64)
+            elif dtype.kind == 'b':
+                taken = taken.astype(object)
+            taken[:, missing] = np.nan
+        if interpolate and taken.dtype.kind == 'f':
+            values = taken if taken.dtype == np.float64 else taken.astype(np.float64)
+            _interpolate_linear(values)
+            taken = values.astype(taken.dtype, copy=False)
+        frames.append(pd.DataFrame(taken.T, index=index, columns=names, copy=False))
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, axis=1)[df.columns]
+
+
+def _interpolate_linear(values: np.ndarray) -> None:
+    """
+    Fill the NaNs of a 2-D float64 array of shape (columns, rows) in place, as
+    DataFrame.interpolate(method='linear') does per column: linearly between valid
+    rows, with the last valid value after them and leading NaNs left alone.
+
+    pandas computes this with np.interp too, so the results are identical. The valid
+    and target rows are found once for all columns that share the same gaps.
+    """
+    valid = ~np.isnan(values)
+    common = valid.all(axis=0)
+    shared = (valid == common).all(axis=1)
+    common_known = np.flatnonzero(common)
+    common_fill = np.flatnonzero(~common[common_known[0]:]) + common_known[0] if len(common_known) else None
+
+    for column in range(len(values)):
+        if shared[column]:
+            known, fill = common_known, common_fill
+        else:
+            known = np.flatnonzero(valid[column])
+            fill = np.flatnonzero(~valid[column, known[0]:]) + known[0] if len(known) else None
+        if len(known) and len(fill):
+            values[column, fill] = np.interp(fill, known, values[column, known])
+
+
+def _resample_numpy(df: pd.DataFrame, method: str) -> pd.DataFrame:
+    """
+    Resample a prepared frame onto the INTERVAL grid without DataFrame.resample.
+
+    Gives the same frame as df.resample(INTERVAL).ffill() for method 'ffill' and
+    df.resample(INTERVAL).interpolate(method='linear') for method 'linear'. The grid
+    is built once and, as it is uniform, the source rows are binned onto it with
+    integer division instead of a search.
+    """
+    if df.empty or not df.index.is_unique:
+        # Leave the edge cases to pandas
+        return _resample(df, method)
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+
+    step = pd.Timedelta(INTERVAL).value
+    start, index = _grid(df.index)
+    offsets = df.index.as_unit('ns').asi8 - start
+    if method == 'ffill':
+        # Last source row at or before each grid point: count the rows whose
+        # first grid point at or after them is not later
+        first_after = -(-offsets // step)
+        rows = np.cumsum(np.bincount(first_after, minlength=len(index) + 1)[:len(index)]) - 1
+        return _take_rows(df, rows, index)
+
+    # Linear: only source rows exactly on the grid are used, then gaps are interpolated
+    on_grid = np.flatnonzero(offsets % step == 0)
+    rows = np.full(len(index), -1, dtype=np.intp)
+    rows[offsets[on_grid] // step] = on_grid
+    return _take_rows(df, rows, index, interpolate=True)
+
+
+def benchmark_resampling(rows: Tuple[int, ...] = (1_000_000, 10_000_000), columns: int = 4) -> None:
+    """
+    Compare the 'pandas' and 'numpy' resamplers on synthetic irregular data.
+
+    Samples arrive every 5 to 15 seconds. Both resamplers run both methods and
+    their outputs are checked to be equal.
+
+    Parameters
+    ----------
+    rows : tuple of int, optional
+        The input sizes to time. Defaults to 10^6 and 10^7 rows.
+    columns : int, optional
+        The number of float64 columns. Defaults to 4.
+    """
+    rng = np.random.default_rng(0)
+    for n in rows:
+        offsets = np.cumsum(rng.integers(5, 16, n)) * 1_000_000_000
+        index = pd.DatetimeIndex(np.datetime64('2024-01-01', 'ns') + offsets, name=TIMESTAMP_COLUMN)
+        df = pd.DataFrame(rng.standard_normal((n, columns)), index=index,
+                          columns=[f'c{i}' for i in range(columns)])
+        for method in ('ffill', 'linear'):
+            start = time.perf_counter()
+            expected = _resample(df, method, 'pandas')
+            pandas_time = time.perf_counter() - start
+            start = time.perf_counter()
+            actual = _resample(df, method, 'numpy')
+            numpy_time = time.perf_counter() - start
+            pd.testing.assert_frame_equal(actual, expected)
+            print(f"{n:>12,} rows {method:>6}: pandas {pandas_time:7.3f} s, numpy {numpy_time:7.3f} s "
+                  f"({pandas_time / numpy_time:.1f}x)")
+
+
+def write_interpolated(df: pd.DataFrame, output: str) -> None:
+    """
+    Save interpolated data, choosing the format by the file extension.
+
+    '.parquet' and '.feather' files (requires pyarrow) keep the column dtypes and
+    the timestamp index and leave out the derived 'Time' text column. Any other
+    extension is written as CSV in the same layout as the __main__ path.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The output of interpolate_timestamp.
+    output : str
+        The target file path.
+    """
+    if output.endswith(('.parquet', '.feather')):
+        df = df.drop(columns='Time', errors='ignore')
+        if output.endswith('.parquet'):
+            df.to_parquet(output, index=True)
+        else:
+            # Feather cannot store a non-default index
+            df.reset_index().to_feather(output)
+    else:
+        df.to_csv(output, index=True, sep=DELIMITER)
+
+
+def weather_frame(data: Dict, timezone: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load Open-Meteo hourly arrays into a timestamp-indexed frame.
+
+    Parameters
+    ----------
+    data : dict
+        A response of openmeteo_client.get_weather_data (unixtime 'hourly' arrays),
+        or a mapping of columns with a 'time' column such as openmeteo_client.load_site
+        returns.
+    timezone : str, optional
+        Convert the UTC times to naive local times of this zone, e.g. 'Europe/Prague',
+        to match the CSV timestamps. Defaults to the response's 'utc_offset_seconds'
+        (UTC if absent).
+
+    Returns
+    -------
+    pandas.DataFrame
+        The float64 weather columns indexed by TIMESTAMP_COLUMN, sorted by time.
+    """
+    columns = data.get('hourly', data)
+    stamps = np.asarray(columns['time'], dtype=np.int64) * 1_000_000_000
+    if timezone is not None:
+        index = pd.DatetimeIndex(pd.to_datetime(stamps, utc=True).tz_convert(timezone).tz_localize(None))
+    else:
+        index = pd.DatetimeIndex(stamps + data.get('utc_offset_seconds', 0) * 1_000_000_000)
+    frame = pd.DataFrame(
+        {name: np.asarray(values, dtype=np.float64) for name, values in columns.items() if name != 'time'},
+        index=index.rename(TIMESTAMP_COLUMN),
+    )
+    # Local times repeat an hour when the clocks go back
+    return frame.sort_index(kind='stable')
+
+
+def _weather_plan(grid: np.ndarray, hours: np.ndarray, method: str,
+                  tolerance: int) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """Locate each grid stamp among the hourly stamps once, for all weather columns."""
+    rows = np.searchsorted(hours, grid, side='right') - 1
+    valid = rows >= 0
+    if method == 'asof':
+        valid &= grid - hours[np.maximum(rows, 0)] <= tolerance
+        return np.maximum(rows, 0), valid, None
+    # Linear: between two hours; exactly on the last hour counts as inside
+    at_last = rows == len(hours) - 1
+    valid &= ~at_last | (grid == hours[-1])
+    rows = np.clip(rows, 0, max(len(hours) - 2, 0))
+    if len(hours) < 2:
+        return rows, valid, np.zeros(len(grid))
+    weights = (grid - hours[rows]) / (hours[rows + 1] - hours[rows])
+    return rows, valid, weights
+
+
+def _apply_weather_plan(values: np.ndarray, plan: Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]) -> np.ndarray:
+    """Evaluate a plan on a 2-D (columns, hours) array, giving (columns, grid rows)."""
+    rows, valid, weights = plan
+    # np.take is several times faster than fancy indexing here
+    if weights is None:
+        result = np.take(values, rows, axis=1)
+    else:
+        following = np.minimum(rows + 1, values.shape[1] - 1)
+        start = np.take(values, rows, axis=1)
+        result = start + (np.take(values, following, axis=1) - start) * weights
+    result[:, ~valid] = np.nan
+    return result
+
+
+def join_weather(
+    frames: Dict[str, pd.DataFrame],
+    weather: Dict[str, Dict],
+    method: str = 'linear',
+    timezone: Optional[str] = None,
+    tolerance: str = WEATHER_TOLERANCE,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Join hourly Open-Meteo weather onto normalized series, site by site.
+
+    Every weather column is aligned onto the rows of the site's frame in one
+    vectorized step: a single np.searchsorted locates all rows among the hours and
+    the result is gathered for all columns at once. Sites sharing the same grid and
+    hours (the usual case for one date range) reuse the same alignment.
+
+    Missing (null) hourly values are skipped by 'linear', which interpolates across
+    them from the neighbouring valid hours, like pandas time interpolation; such
+    columns get an alignment of their own. 'asof' returns NaN for rows whose last
+    hour is null, like pandas.merge_asof.
+
+    Parameters
+    ----------
+    frames : dict
+        Site name to the output of interpolate_timestamp.
+    weather : dict
+        Site name to weather data, see weather_frame. Sites missing here are skipped.
+    method : str, optional
+        One of WEATHER_METHODS: 'linear' interpolates between the hours, 'asof'
+        takes the last hour at or before each row. Defaults to 'linear'.
+    timezone : str, optional
+        The zone of the CSV timestamps, see weather_frame.
+    tolerance : str, optional
+        For 'asof', how old the last hour may be before the row gets NaN.
+        Defaults to WEATHER_TOLERANCE.
+
+    Returns
+    -------
+    dict
+        Site name to a copy of its frame with the weather columns appended. Rows
+        outside the weather's time range get NaN.
+
+    Raises
+    ------
+    ValueError
+        If method is not one of WEATHER_METHODS.
+    """
+    if method not in WEATHER_METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {WEATHER_METHODS}")
+    tolerance_ns = pd.Timedelta(tolerance).value
+
+    plans: Dict[Tuple[bytes, bytes], Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]] = {}
+
+    def align(grid: np.ndarray, hours: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Align (columns, hours) values onto grid, reusing the plan for the same stamps."""
+        if len(hours) == 0:
+            return np.full((len(values), len(grid)), np.nan)
+        key = (grid.tobytes(), hours.tobytes())
+        if key not in plans:
+            plans[key] = _weather_plan(grid, hours, method, tolerance_ns)
+        return _apply_weather_plan(values, plans[key])
+
+    joined = {}
+    for site, frame in frames.items():
+        if site not in weather:
+            continue
+        hourly = weather_frame(weather[site], timezone)
+        grid = frame.index.as_unit('ns').asi8
+        hours = hourly.index.as_unit('ns').asi8
+        hourly_values = np.ascontiguousarray(hourly.to_numpy().T)
+        missing = np.isnan(hourly_values)
+        gaps = missing.any(axis=1) if method == 'linear' else np.zeros(len(hourly_values), dtype=bool)
+        values = np.empty((len(hourly_values), len(grid)))
+        if not gaps.all():
+            values[~gaps] = align(grid, hours, hourly_values[~gaps])
+        for column in np.flatnonzero(gaps):
+            known = ~missing[column]
+            values[column] = align(grid, hours[known], hourly_values[column, known][None, :])[0]
+        weather_columns = pd.DataFrame(values.T, index=frame.index, columns=hourly.columns, copy=False)
+        joined[site] = pd.concat([frame, weather_columns], axis=1)
+    return joined
+
+
+def _read_chunks(name: str, chunksize: int, encoding: Optional[str] = None,
+                 **kwargs) -> Iterator[pd.DataFrame]:
+    """Yield the CSV file in chunks of at most `chunksize` rows."""
+    return pd.read_csv(f'{name}.csv', delimiter=DELIMITER, encoding=encoding or ENCODING, skiprows=1,
+                       chunksize=chunksize, **kwargs)
+
+
+class _ChunkWriter:
+    """Append DataFrame chunks to a CSV or Parquet file as they are produced."""
+
+    def __init__(self, output: str, append: bool = False):
+        self.output = output
+        self.parquet = output.endswith('.parquet')
+        self.append = append and not self.parquet
+        self.rows = 0
+        self._writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        if self.parquet:
+            # Optional dependency, only needed for Parquet output
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                table = pa.Table.from_pandas(df)
+                self._writer = pq.ParquetWriter(self.output, table.schema)
+            else:
+                table = pa.Table.from_pandas(df, schema=self._writer.schema)
+            self._writer.write_table(table)
+        else:
+            first = self.rows == 0 and not self.append
+            df.to_csv(self.output, mode='w' if first else 'a',
+                      header=first, index=True, sep=DELIMITER)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _GridResampler:
+    """
+    Resample consecutive chunks onto the INTERVAL grid.
+
+    The state needed to continue across a chunk boundary is kept between calls:
+    the last source row for forward fill, and the grid rows that still wait for a
+    later valid value for linear interpolation.
+    """
+
+    def __init__(self, compressor_off: bool):
+        self.compressor_off = compressor_off
+        self.carry: Optional[pd.DataFrame] = None     # last source row, for ffill
+        self.pending: Optional[pd.DataFrame] = None   # unresolved grid rows, for interpolation
+        self.last_grid: Optional[pd.Timestamp] = None
+
+    def feed(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Resample a prepared chunk and return the grid rows that are final."""
+        if chunk.empty:
+            return chunk
+        numeric = chunk.select_dtypes('number').columns
+        chunk[numeric] = chunk[numeric].astype('float64')
+
+        start = chunk.index[0].floor(INTERVAL) if self.last_grid is None \
+            else self.last_grid + pd.Timedelta(INTERVAL)
+        end = chunk.index[-1].floor(INTERVAL)
+        grid = pd.date_range(start, end, freq=INTERVAL, name=TIMESTAMP_COLUMN)
+        if len(grid):
+            self.last_grid = grid[-1]
+
+        if not self.compressor_off:
+            source = chunk if self.carry is None else pd.concat([self.carry, chunk])
+            self.carry = chunk.iloc[-1:]
+            return source.reindex(grid, method='ffill')
+
+        grid_rows = chunk.reindex(grid)
+        pending = grid_rows if self.pending is None else pd.concat([self.pending, grid_rows])
+        numeric = pending.select_dtypes('number').columns
+        # Only fill gaps that are closed on both sides, the trailing
+        # ones depend on values in later chunks
+        pending = pending.copy()
+        pending[numeric] = pending[numeric].interpolate(method='linear', limit_area='inside')
+
+        # Hold back every row from the earliest last valid value onwards
+        cut = len(pending) - 1
+        for column in numeric:
+            last_valid = pending[column].last_valid_index()
+            if last_valid is not None:
+                cut = min(cut, pending.index.get_loc(last_valid))
+
+        self.pending = pending.iloc[cut:]
+        return pending.iloc[:cut]
+
+    def finish(self) -> pd.DataFrame:
+        """Return the rows still held back, resolved as at the end of the file."""
+        if self.pending is None or self.pending.empty:
+            return pd.DataFrame()
+        done = self.pending.copy()
+        numeric = done.select_dtypes('number').columns
+        done[numeric] = done[numeric].interpolate(method='linear')
+        self.pending = None
+        return done
+
+    def to_state(self) -> dict:
+        """Return the carried-over state as a JSON-serializable dict."""
+        return {
+            'compressor_off': self.compressor_off,
+            'last_grid': None if self.last_grid is None else self.last_grid.isoformat(),
+            'carry': _frame_to_state(self.carry),
+            'pending': _frame_to_state(self.pending),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> '_GridResampler':
+        """Rebuild a resampler from the output of to_state."""
+        resampler = cls(state['compressor_off'])
+        if state['last_grid'] is not None:
+            resampler.last_grid = pd.Timestamp(state['last_grid'])
+        resampler.carry = _frame_from_state(state['carry'])
+        resampler.pending = _frame_from_state(state['pending'])
+        return resampler
+
+
+def _frame_to_state(df: Optional[pd.DataFrame]) -> Optional[dict]:
+    """Serialize a small timestamp-indexed frame for a JSON checkpoint."""
+    if df is None:
+        return None
+    return {
+        'index': [timestamp.isoformat() for timestamp in df.index],
+        'columns': df.columns.tolist(),
+        'dtypes': [str(dtype) for dtype in df.dtypes],
+        'data': df.astype(object).where(df.notna(), None).values.tolist(),
+    }
+
+
+def _frame_from_state(state: Optional[dict]) -> Optional[pd.DataFrame]:
+    """Inverse of _frame_to_state."""
+    if state is None:
+        return None
+    index = pd.DatetimeIndex(state['index'], name=TIMESTAMP_COLUMN)
+    df = pd.DataFrame(state['data'], index=index, columns=state['columns'], dtype=object)
+    return df.astype(dict(zip(state['columns'], state['dtypes'])))
+
+
+def interpolate_timestamp_streaming(
+    name: str,
+    output: str,
+    chunksize: int = CHUNK_SIZE,
+    schema: Optional[CsvSchema] = None,
+) -> int:
+    """
+    Interpolate timestamps like interpolate_timestamp, without loading the whole file.
+
+    The CSV file is read in chunks of `chunksize` rows and each chunk is resampled
+    to INTERVAL on its own. The rows around the chunk boundaries are carried over to
+    the next chunk, so the output has the same values as the in-memory path. Result
+    rows are appended to `output` as soon as they are final, so peak memory depends
+    on the chunk size rather than the file size.
+
+    Two passes are made over the file: the first reads only the compressor column
+    to make the same linear/ffill choice as the in-memory path. Numeric columns are
+    written as floats, as resampling a file whose first sample is off the 10-second
+    grid does in the in-memory path. In linear mode, a grid row is held back until
+    every column has a valid value after it, so very long gaps of missing values in
+    a column grow the carried-over rows.
+
+    Parameters
+    ----------
+    name : str
+        The base name for CSV files (excluding extension).
+    output : str
+        The target file. Written as Parquet without the 'Time' column if it ends
+        with '.parquet' (requires pyarrow), otherwise as CSV with the same layout
+        as the __main__ path.
+    chunksize : int, optional
+        The number of CSV rows parsed at once. Defaults to CHUNK_SIZE.
+    schema : CsvSchema, optional
+        Dtypes and timestamp format. The pyarrow engine is not supported here.
+
+    Returns
+    -------
+    int
+        The number of rows written, or 0 if the source file does not exist.
+    """
+    schema = schema or CsvSchema()
+    if schema.engine == 'pyarrow':
+        raise ValueError("The pyarrow engine cannot read in chunks, use the default engine")
+
+    try:
+        # First pass: the resampling method depends on the whole compressor column
+        compressor_off = all(
+            (chunk[COMPRESSOR_COLUMN] <= 0).all()
+            for chunk in _read_chunks(name, chunksize, schema.encoding, usecols=[COMPRESSOR_COLUMN])
+        )
+
+        writer = _ChunkWriter(output)
+        resampler = _GridResampler(compressor_off)
+        try:
+            for chunk in _read_chunks(name, chunksize, schema.encoding, dtype=schema.dtypes):
+                chunk = _prepare_frame(chunk, schema.timestamp_format,
+                                       time_column=not writer.parquet)
+                writer.write(resampler.feed(chunk))
+            writer.write(resampler.finish())
+        finally:
+            writer.close()
+
+        return writer.rows
+
+    except FileNotFoundError:
+        print(f"Error: File '{name}.csv' not found.")
+        return 0
+
+
+def _read_line_blocks(file, start: int, end: Optional[int] = None,
+                      block_size: int = BLOCK_SIZE) -> Iterator[Tuple[bytes, int]]:
+    """
+    Yield blocks of complete lines from a binary file, starting at byte `start`.
+
+    Each block comes with the byte offset just after it. A trailing line without
+    a newline (still being written) is not yielded.
+    """
+    file.seek(start)
+    position = start
+    rest = b''
+    while end is None or position < end:
+        data = file.read(block_size if end is None else min(block_size, end - position))
+        if not data:
+            break
+        position += len(data)
+        data = rest + data
+        cut = data.rfind(b'\n') + 1
+        rest = data[cut:]
+        if cut:
+            yield data[:cut], position - len(rest)
+
+
+def _parse_block(block: bytes, columns: List[str], schema: CsvSchema, **kwargs) -> pd.DataFrame:
+    """Parse a block of headerless CSV lines."""
+    return pd.read_csv(io.BytesIO(block), delimiter=DELIMITER, encoding=schema.encoding or ENCODING,
+                       header=None, names=columns, dtype=schema.dtypes, **kwargs)
+
+
+def interpolate_timestamp_incremental(
+    name: str,
+    checkpoint: Optional[str] = None,
+    schema: Optional[CsvSchema] = None,
+) -> int:
+    """
+    Normalize only the rows appended to the CSV file since the previous run.
+
+    A small JSON checkpoint next to the output keeps the byte offset up to which
+    the source was processed, the last grid timestamp and the rows carried over
+    across the boundary. Each run parses only the bytes after that offset and
+    appends the new grid rows to `<name>_interpolated.csv`, so a run costs
+    O(new data) instead of O(file). The first run (no checkpoint) processes the
+    whole file in blocks, like interpolate_timestamp_streaming.
+
+    A line that is still being written (no trailing newline) is left for the next
+    run. In linear mode the last rows are held back until a later value resolves
+    them, so the output lags behind the source by the current gap. If the compressor
+    starts running in a file that was interpolated linearly so far, the in-memory
+    path would switch the whole file to forward fill, so the output is rebuilt once.
+
+    The checkpoint is replaced atomically and records the output size, so rows
+    appended by a run that was killed before it saved its checkpoint are cut off
+    again. A checkpoint that cannot be read is treated as missing.
+
+    Parameters
+    ----------
+    name : str
+        The base name for CSV files (excluding extension).
+    checkpoint : str, optional
+        Path of the checkpoint file. Defaults to `<name>_interpolated.csv.checkpoint.json`.
+    schema : CsvSchema, optional
+        Dtypes and timestamp format. The pyarrow engine is not supported here.
+
+    Returns
+    -------
+    int
+        The number of rows appended, or 0 if the source file does not exist.
+    """
+    schema = schema or CsvSchema()
+    output = f'{name}_interpolated.csv'
+    checkpoint = checkpoint or f'{output}.checkpoint.json'
+
+    state = None
+    if os.path.exists(checkpoint) and os.path.exists(output):
+        try:
+            with open(checkpoint) as file:
+                state = json.load(file)
+            output_size = state['output_size']
+        except (ValueError, KeyError, TypeError):
+            # Unreadable or from an older version, rebuild the output
+            state = None
+        else:
+            if os.path.getsize(output) < output_size:
+                state = None
+            elif os.path.getsize(output) > output_size:
+                # Rows written after the checkpoint by an interrupted run
+                os.truncate(output, output_size)
+
+    try:
+        with open(f'{name}.csv', 'rb') as source:
+            if state is not None and os.fstat(source.fileno()).st_size < state['offset']:
+                # The source was truncated or replaced, start over
+                state = None
+
+            if state is None:
+                source.readline()  # skipped first line, as skiprows=1
+                header = source.readline()
+                if not header.endswith(b'\n'):
+                    return 0  # header not fully written yet
+                columns = pd.read_csv(io.BytesIO(header), delimiter=DELIMITER,
+                                      encoding=schema.encoding or ENCODING, nrows=0).columns.tolist()
+                offset = source.tell()
+
+                # The resampling method depends on the whole compressor column
+                end = offset
+                compressor_off = True
+                for block, end in _read_line_blocks(source, offset):
+                    values = _parse_block(block, columns, schema, usecols=[COMPRESSOR_COLUMN])
+                    compressor_off = compressor_off and bool((values[COMPRESSOR_COLUMN] <= 0).all())
+                resampler = _GridResampler(compressor_off)
+            else:
+                columns = state['columns']
+                offset = end = state['offset']
+                resampler = _GridResampler.from_state(state['resampler'])
+
+            writer = _ChunkWriter(output, append=state is not None)
+            for block, block_end in _read_line_blocks(source, offset, None if state else end):
+                chunk = _prepare_frame(_parse_block(block, columns, schema), schema.timestamp_format)
+                if resampler.compressor_off and (chunk[COMPRESSOR_COLUMN] > 0).any():
+                    # Forward fill applies to the whole file from now on
+                    os.remove(checkpoint)
+                    os.remove(output)
+                    return interpolate_timestamp_incremental(name, checkpoint, schema)
+                writer.write(resampler.feed(chunk))
+                end = block_end
+    except FileNotFoundError:
+        print(f"Error: File '{name}.csv' not found.")
+        return 0
+
+    if state is None and writer.rows == 0:
+        # Create the output with its header even if there are no grid rows yet
+        header = pd.DataFrame(columns=columns + ['Time']).set_index(TIMESTAMP_COLUMN)
+        header.to_csv(output, index=True, sep=DELIMITER)
+
+    temporary = f'{checkpoint}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump({'offset': end, 'columns': columns, 'output_size': os.path.getsize(output),
+                   'resampler': resampler.to_state()}, file)
+    os.replace(temporary, checkpoint)
+    return writer.rows
+
+
+class BatchResult(NamedTuple):
+    """Outcome of normalizing one file in a batch."""
+    name: str
+    rows: int
+    seconds: float
+    skipped: bool
+    error: Optional[str] = None
+
+
+def _file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_up_to_date(source: str, output: str, use_hash: bool) -> bool:
+    """Check whether `output` was produced from the current `source`."""
+    if not os.path.exists(output):
+        return False
+    if not use_hash:
+        return os.path.getmtime(output) >= os.path.getmtime(source)
+    try:
+        with open(f'{output}.sha256') as file:
+            return file.read().strip() == _file_hash(source)
+    except FileNotFoundError:
+        return False
+
+
+def _normalize_file(name: str, strategy: str, use_hash: bool, output_format: str,
+                    schema: CsvSchema, resampler: str = 'pandas') -> BatchResult:
+    """Normalize one file in a worker process and write `<name>_interpolated.<format>`."""
+    start = time.perf_counter()
+    try:
+        source, schema = _utf8_source(name, schema)
+        df_interpolated = interpolate_timestamp(source, strategy, schema,
+                                                time_column=output_format == 'csv',
+                                                resampler=resampler)
+        output = f'{name}_interpolated.{output_format}'
+        write_interpolated(df_interpolated, output)
+        if use_hash:
+            with open(f'{output}.sha256', 'w') as file:
+                file.write(_file_hash(f'{name}.csv'))
+        return BatchResult(name, len(df_interpolated), time.perf_counter() - start, False)
+    except Exception as e:
+        return BatchResult(name, 0, time.perf_counter() - start, False, str(e))
+
+
+def _utf8_source(name: str, schema: CsvSchema) -> Tuple[str, CsvSchema]:
+    """Return the base name and schema to read a source by, preferring its `<name>.utf8.csv` copy."""
+    copy = f'{name}{UTF8_SUFFIX}'
+    if os.path.exists(f'{copy}.csv'):
+        return copy, schema._replace(encoding='utf-8')
+    return name, schema
+
+
+def _collect_sources(source: str) -> List[str]:
+    """
+    Expand a directory or glob pattern into base names of source CSV files.
+
+    UTF-8 copies from encoding_detector.transcode_to_utf8 (`<name>.utf8.csv`) stand
+    for their original `<name>.csv`, so each export is listed once.
+    """
+    pattern = os.path.join(source, '*.csv') if os.path.isdir(source) else source
+    names = set()
+    for path in glob.glob(pattern):
+        if not path.endswith('.csv') or path.endswith('_interpolated.csv'):
+            continue
+        name = path[:-len('.csv')]
+        if name.endswith(UTF8_SUFFIX) and os.path.exists(f'{name[:-len(UTF8_SUFFIX)]}.csv'):
+            name = name[:-len(UTF8_SUFFIX)]
+        names.add(name)
+    return sorted(names)
+
+
+def normalize_batch(
+    source: str,
+    workers: Optional[int] = None,
+    strategy: str = 'global',
+    use_hash: bool = False,
+    force: bool = False,
+    output_format: str = 'csv',
+    schema: Optional[CsvSchema] = None,
+    resampler: str = 'pandas',
+) -> List[BatchResult]:
+    """
+    Normalize every CSV file in a directory or matching a glob pattern.
+
+    Files are processed by interpolate_timestamp in a pool of worker processes and
+    written next to the source as `<name>_interpolated.<format>`. Files whose output is
+    newer than the source (or, with `use_hash`, was produced from a source with the
+    same SHA-256 digest) are skipped. Sources transcoded to `<name>.utf8.csv` are
+    read from the UTF-8 copy as 'utf-8' instead, still writing and checking against
+    `<name>_interpolated.<format>`. Per-file timing and throughput are printed as
+    the files complete.
+
+    Parameters
+    ----------
+    source : str
+        A directory, or a glob pattern such as 'exports/tc_*.csv'.
+    workers : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    strategy : str, optional
+        The interpolation strategy, see interpolate_timestamp. Defaults to 'global'.
+    use_hash : bool, optional
+        Detect changed sources by content hash instead of mtime. Defaults to False.
+    force : bool, optional
+        Normalize all files, even if they are up to date. Defaults to False.
+    output_format : str, optional
+        One of OUTPUT_FORMATS. Defaults to 'csv'.
+    schema : CsvSchema, optional
+        How to parse the source files, see interpolate_timestamp.
+    resampler : str, optional
+        The resampling engine, see interpolate_timestamp. Defaults to 'pandas'.
+
+    Returns
+    -------
+    list of BatchResult
+        One result per source file, in completion order.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+    schema = schema or CsvSchema()
+
+    results = []
+    pending = []
+    for name in _collect_sources(source):
+        output = f'{name}_interpolated.{output_format}'
+        if not force and _is_up_to_date(f'{name}.csv', output, use_hash):
+            results.append(BatchResult(name, 0, 0.0, True))
+        else:
+            pending.append(name)
+
+    print(f"{len(pending)} file(s) to normalize, {len(results)} up to date")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_normalize_file, name, strategy, use_hash, output_format, schema,
+                                   resampler)
+                   for name in pending]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result.error:
+                print(f"{result.name}: error: {result.error}")
+            else:
+                rate = result.rows / result.seconds if result.seconds else 0.0
+                print(f"{result.name}: {result.rows} rows in {result.seconds:.2f} s ({rate:,.0f} rows/s)")
+
+    total_rows = sum(result.rows for result in results)
+    elapsed = time.perf_counter() - start
+    print(f"Done: {total_rows} rows in {elapsed:.2f} s")
+    return results
+
+
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="Normalize heat pump CSV exports to a 10-second grid.")
+    parser.add_argument('source', nargs='?',
+                        help="Directory or glob pattern of CSV files. Defaults to SOURCE_NAME.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes.")
+    parser.add_argument('--strategy', choices=STRATEGIES, default='global')
+    parser.add_argument('--hash', action='store_true', help="Detect changed files by content hash.")
+    parser.add_argument('--force', action='store_true', help="Normalize up-to-date files too.")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv', help="Output file format.")
+    parser.add_argument('--timestamp-format', help="strftime format of the timestamp column.")
+    parser.add_argument('--engine', choices=('pyarrow',), help="CSV parser engine.")
+    parser.add_argument('--encoding', help=f"Source file encoding. Defaults to {ENCODING}.")
+    parser.add_argument('--resampler', choices=RESAMPLERS, default='pandas', help="Resampling engine.")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Time the resamplers on synthetic data and exit.")
+    args = parser.parse_args()
+    schema = CsvSchema(timestamp_format=args.timestamp_format, engine=args.engine, encoding=args.encoding)
+
     try:
-        interpolated_df = interpolate_timestamp(SOURCE_NAME)
-        # Save the modified data to a new CSV file with the correct extension
-        interpolated_df.to_csv(f'{SOURCE_NAME}_interpolated.csv', index=True, sep=DELIMITER)
+        if args.benchmark:
+            benchmark_resampling()
+        elif args.source:
+            normalize_batch(args.source, args.workers, args.strategy, args.hash, args.force,
+                            args.format, schema, args.resampler)
+        else:
+            interpolated_df = interpolate_timestamp(SOURCE_NAME, args.strategy, schema,
+                                                    time_column=args.format == 'csv',
+                                                    resampler=args.resampler)
+            # Save the modified data to a new file with the correct extension
+            write_interpolated(interpolated_df, f'{SOURCE_NAME}_interpolated.{args.format}')
 
     except Exception as e:
         print(f"An error occurred: {str(e)}")
@@ -10,24 +10,88 @@ and time frame, and to save this data in a JSON format.
 
 Functions:
 - get_weather_data: Fetches weather data from the Open Meteo API.
+- fetch_weather_batch: Fetches weather data for many jobs concurrently over a pooled session.
+- WeatherCache: SQLite cache of responses with per-day splitting of date ranges.
 - save_as_json: Saves the fetched data into a JSON file.
+- save_as_npz / save_as_parquet: Save the hourly arrays of a response in a columnar file.
+- append_to_dataset: Appends the hourly arrays to a per-site dataset of raw column files.
+- load_npz / load_site: Load columns back; load_site memory-maps them.
 
 Usage:
 Call get_weather_data with latitude, longitude, start_date, and end_date parameters,
 and then use save_as_json to save the data to a file.
 
+For many sites, pass a list of WeatherJob tuples to fetch_weather_batch. It reuses
+pooled connections, bounds the concurrency, rate-limits requests per host and retries
+with exponential backoff on 429 and 5xx responses. Point `url` at a local mock server
+to test it offline.
+
+Both functions accept a WeatherCache. Responses for past date ranges are kept forever,
+ranges reaching today or the future expire after FORECAST_TTL seconds, and concurrent
+requests for the same parameters share one fetch. With split_days=True a range is
+cached per day, so overlapping ranges only fetch the days not cached yet.
+
+For many locations, prefer the columnar writers over save_as_json. append_to_dataset
+keeps one directory per site with one raw binary file per hourly column, so runs append
+without rewriting and load_site memory-maps a single site's series.
+
 """
 
-from typing import Optional, Dict, Union
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional, Dict, List, NamedTuple, Tuple, Union
+from urllib.parse import urlsplit
 import json
+import os
+
+# Third-party imports
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://api.open-meteo.com/v1/forecast"
+# Status codes worth retrying: rate limiting and server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+CACHE_PATH = ".openmeteo_cache.sqlite"
+FORECAST_TTL = 3600  # seconds a response covering today or later stays valid
+COORDINATE_PRECISION = 4  # decimals of latitude/longitude used in cache keys
+TIME_COLUMN = "time"  # unixtime seconds, stored as int64; other columns as float64
+COLUMN_SUFFIX = ".bin"
+
+
+class WeatherJob(NamedTuple):
+    """Coordinates and date range of one weather data request."""
+    latitude: float
+    longitude: float
+    start_date: str
+    end_date: str
+
+
+def _build_params(latitude: float, longitude: float, start_date: str, end_date: str) -> Dict[str, Union[str, float]]:
+    """Build the query parameters of a weather data request."""
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "hourly": "temperature_2m,shortwave_radiation",
+        "wind_speed_unit": "ms",
+        "timeformat": "unixtime",
+        "start_date": start_date,
+        "end_date": end_date,
+    }
 
 
 def get_weather_data(
     latitude: float, 
     longitude: float, 
     start_date: str, 
-    end_date: str
+    end_date: str,
+    session: Optional[requests.Session] = None,
+    url: str = API_URL,
+    cache: Optional["WeatherCache"] = None,
+    split_days: bool = False,
 ) -> Optional[Dict[str, Union[str, float]]]:
     """
     Fetch weather data from the Open Meteo API.
@@ -42,6 +106,14 @@ def get_weather_data(
         The start date for the weather forecast in the format "YYYY-MM-DD".
     end_date : str
         The end date for the weather forecast in the format "YYYY-MM-DD".
+    session : requests.Session, optional
+        Session to send the request with, reusing its connections.
+    url : str, optional
+        The API endpoint. Defaults to API_URL.
+    cache : WeatherCache, optional
+        Cache to serve the response from and store it in.
+    split_days : bool, optional
+        Cache the range per day and fetch only the missing days. Defaults to False.
 
     Returns
     -------
@@ -50,19 +122,18 @@ def get_weather_data(
 
     """
 
-    url = f"https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "hourly": "temperature_2m,shortwave_radiation",
-        "wind_speed_unit": "ms",
-        "timeformat": "unixtime",
-        "start_date": start_date,
-        "end_date": end_date,
-    }
+    if cache is not None:
+        return cache.fetch(
+            WeatherJob(latitude, longitude, start_date, end_date),
+            lambda job: get_weather_data(*job, session=session, url=url),
+            url,
+            split_days,
+        )
+
+    params = _build_params(latitude, longitude, start_date, end_date)
 
     try:
-        response = requests.get(url, params=params)
+        response = (session or requests).get(url, params=params)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -70,6 +141,374 @@ def get_weather_data(
         return None
 
 
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting the request rate per host.
+
+    Methods
+    -------
+    wait(host: str)
+        Blocks until a request to host is allowed.
+
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        rate : float
+            Allowed requests per second and host.
+        burst : int, optional
+            Maximum number of requests sent back to back. Defaults to max(1, rate).
+
+        """
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._buckets: Dict[str, List[float]] = {}  # host -> [tokens, last refill time]
+        self._lock = threading.Lock()
+
+    def wait(self, host: str) -> None:
+        """Block until a request to host may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, [self.burst, now])
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = [tokens - 1, now]
+                    return
+                self._buckets[host] = [tokens, now]
+                delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+
+
+def _fetch_with_retry(
+    session: requests.Session,
+    job: WeatherJob,
+    url: str,
+    limiter: Optional[RateLimiter],
+    max_retries: int,
+    backoff: float,
+) -> Optional[Dict[str, Union[str, float]]]:
+    """Fetch one job, retrying on 429/5xx and connection errors with exponential backoff."""
+    host = urlsplit(url).netloc
+    params = _build_params(*job)
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.wait(host)
+        delay = backoff * 2 ** attempt
+        try:
+            response = session.get(url, params=params, timeout=30)
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response.json()
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            error = f"HTTP {response.status_code}"
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = str(e)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching data for {job}: {e}")
+            return None
+        if attempt < max_retries:
+            time.sleep(delay)
+    print(f"Error fetching data for {job}: {error} after {max_retries + 1} attempts")
+    return None
+
+
+def fetch_weather_batch(
+    jobs: List[WeatherJob],
+    max_workers: int = 8,
+    rate_limit: Optional[float] = 10.0,
+    max_retries: int = 5,
+    backoff: float = 0.5,
+    url: str = API_URL,
+    cache: Optional["WeatherCache"] = None,
+    split_days: bool = False,
+) -> List[Optional[Dict[str, Union[str, float]]]]:
+    """
+    Fetch weather data for many locations and date ranges concurrently.
+
+    Requests share one requests.Session whose connection pool is sized to the
+    number of workers, so TCP/TLS connections are reused across jobs.
+
+    Parameters
+    ----------
+    jobs : list of WeatherJob
+        The (latitude, longitude, start_date, end_date) requests to send.
+    max_workers : int, optional
+        Maximum number of requests in flight. Defaults to 8.
+    rate_limit : float, optional
+        Maximum requests per second per host, or None for no limit. Defaults to 10.
+    max_retries : int, optional
+        Retries per job on 429, 5xx and connection errors. Defaults to 5.
+    backoff : float, optional
+        Delay before the first retry in seconds, doubled for each further retry.
+        A longer Retry-After header takes precedence. Defaults to 0.5.
+    url : str, optional
+        The API endpoint. Defaults to API_URL.
+    cache : WeatherCache, optional
+        Cache to serve responses from and store them in.
+    split_days : bool, optional
+        Cache each range per day and fetch only the missing days. Defaults to False.
+
+    Returns
+    -------
+    list
+        Weather data for each job in the order of `jobs`, None for failed jobs.
+
+    """
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        def fetch(job: WeatherJob) -> Optional[Dict[str, Union[str, float]]]:
+            return _fetch_with_retry(session, job, url, limiter, max_retries, backoff)
+
+        def run(job: WeatherJob) -> Optional[Dict[str, Union[str, float]]]:
+            job = WeatherJob(*job)
+            if cache is None:
+                return fetch(job)
+            return cache.fetch(job, fetch, url, split_days)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, jobs))
+
+
+def _days(start_date: str, end_date: str) -> List[str]:
+    """List the ISO dates from start_date to end_date inclusive."""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def _split_by_day(data: Dict, days: List[str]) -> Dict[str, Dict]:
+    """Split a response's hourly arrays into one response per local day."""
+    hourly = data.get("hourly", {})
+    offset = data.get("utc_offset_seconds", 0)
+    rows: Dict[str, List[int]] = {day: [] for day in days}
+    for i, timestamp in enumerate(hourly.get("time", [])):
+        day = datetime.fromtimestamp(timestamp + offset, timezone.utc).date().isoformat()
+        if day in rows:
+            rows[day].append(i)
+    return {
+        day: {**data, "hourly": {key: [values[i] for i in indices] for key, values in hourly.items()}}
+        for day, indices in rows.items()
+    }
+
+
+def _merge_days(parts: List[Dict]) -> Dict:
+    """Concatenate per-day responses into a single response."""
+    merged = dict(parts[0])
+    merged["hourly"] = {
+        key: [value for part in parts for value in part["hourly"][key]]
+        for key in parts[0].get("hourly", {})
+    }
+    return merged
+
+
+class WeatherCache:
+    """
+    Persistent SQLite cache of Open-Meteo responses.
+
+    Entries are keyed by the normalized request parameters and the endpoint. Ranges
+    ending before today never expire; ranges reaching today or later expire after
+    forecast_ttl seconds. Concurrent lookups of a missing key wait for a single fetch.
+
+    Methods
+    -------
+    get(key: str)
+        Returns the cached response for key, or None if missing or expired.
+    put(key: str, data: dict, end_date: str)
+        Stores a response covering a range that ends on end_date.
+    fetch(job: WeatherJob, fetch: Callable, url: str, split_days: bool = False)
+        Returns the response for job from the cache, fetching what is missing.
+    close()
+        Closes the database.
+
+    """
+
+    def __init__(self, path: str = CACHE_PATH, forecast_ttl: float = FORECAST_TTL):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            SQLite database file. Defaults to CACHE_PATH.
+        forecast_ttl : float, optional
+            Lifetime in seconds of responses covering today or later. Defaults to FORECAST_TTL.
+
+        """
+        self.forecast_ttl = forecast_ttl
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL)"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+
+    @staticmethod
+    def key(job: WeatherJob, url: str = API_URL) -> str:
+        """Normalize the request parameters of job into a cache key."""
+        params = _build_params(
+            round(float(job.latitude), COORDINATE_PRECISION),
+            round(float(job.longitude), COORDINATE_PRECISION),
+            date.fromisoformat(job.start_date).isoformat(),
+            date.fromisoformat(job.end_date).isoformat(),
+        )
+        return json.dumps({"url": url, **params}, sort_keys=True)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached response for key, or None if it is missing or expired."""
+        with self._lock:
+            row = self._db.execute("SELECT data, expires FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, data: Dict, end_date: str) -> None:
+        """Store data under key; it expires only if end_date is today or later (UTC)."""
+        past = date.fromisoformat(end_date) < datetime.now(timezone.utc).date()
+        expires = None if past else time.time() + self.forecast_ttl
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, data, expires) VALUES (?, ?, ?)",
+                (key, json.dumps(data), expires),
+            )
+            self._db.commit()
+
+    def _try_claim(self, key: str) -> Tuple[Optional[Dict], Optional[threading.Event], bool]:
+        """
+        Look key up without blocking.
+
+        Returns (data, None, False) on a hit, (None, event, True) if the caller now
+        owns the fetch of key and must release event, and (None, event, False) if
+        another thread is fetching key and will set event when done.
+        """
+        data = self.get(key)
+        if data is not None:
+            return data, None, False
+        with self._lock:
+            event = self._inflight.get(key)
+            if event is None:
+                event = self._inflight[key] = threading.Event()
+                return None, event, True
+        return None, event, False
+
+    def _claim(self, key: str) -> Tuple[Optional[Dict], Optional[threading.Event]]:
+        """Return the cached value, or an event owned by the caller who must fetch key."""
+        while True:
+            data, event, owned = self._try_claim(key)
+            if event is None or owned:
+                return data, event
+            # Another thread is fetching this key; re-check the cache once it is done
+            event.wait()
+
+    def _fetch_one(self, job: WeatherJob, fetch: Callable[[WeatherJob], Optional[Dict]], url: str) -> Optional[Dict]:
+        """Serve job as a single cache entry, fetching it at most once across threads."""
+        key = self.key(job, url)
+        data, event = self._claim(key)
+        if event is None:
+            return data
+        try:
+            data = fetch(job)
+            if data is not None:
+                self.put(key, data, job.end_date)
+            return data
+        finally:
+            self._release(key, event)
+
+    def _release(self, key: str, event: threading.Event) -> None:
+        with self._lock:
+            del self._inflight[key]
+        event.set()
+
+    def fetch(
+        self,
+        job: WeatherJob,
+        fetch: Callable[[WeatherJob], Optional[Dict]],
+        url: str = API_URL,
+        split_days: bool = False,
+    ) -> Optional[Dict]:
+        """
+        Return the response for job, fetching and caching it if needed.
+
+        Parameters
+        ----------
+        job : WeatherJob
+            The request to serve.
+        fetch : callable
+            Called with a WeatherJob to download a response; returns None on failure.
+        url : str, optional
+            The endpoint, part of the cache key. Defaults to API_URL.
+        split_days : bool, optional
+            Cache the range per day. Consecutive missing days are fetched in one
+            request and split before caching. Defaults to False.
+
+        Returns
+        -------
+        dict or None
+            The response, or None if fetching failed.
+
+        """
+        if not split_days:
+            return self._fetch_one(job, fetch, url)
+
+        days = _days(job.start_date, job.end_date)
+        parts: Dict[str, Dict] = {}
+        owned: Dict[str, threading.Event] = {}
+        busy: List[str] = []
+        for day in days:
+            data, event, mine = self._try_claim(self.key(job._replace(start_date=day, end_date=day), url))
+            if event is None:
+                parts[day] = data
+            elif mine:
+                owned[day] = event
+            else:
+                busy.append(day)
+        try:
+            # Fetch each run of consecutive missing days with one request
+            runs: List[List[str]] = []
+            for day in days:
+                if day not in owned:
+                    continue
+                if runs and date.fromisoformat(day) - date.fromisoformat(runs[-1][-1]) == timedelta(days=1):
+                    runs[-1].append(day)
+                else:
+                    runs.append([day])
+            for run in runs:
+                data = fetch(job._replace(start_date=run[0], end_date=run[-1]))
+                if data is None:
+                    return None
+                for day, part in _split_by_day(data, run).items():
+                    self.put(self.key(job._replace(start_date=day, end_date=day), url), part, day)
+                    parts[day] = part
+        finally:
+            for day, event in owned.items():
+                self._release(self.key(job._replace(start_date=day, end_date=day), url), event)
+        # Wait for days other threads are fetching only after releasing our own claims,
+        # so two overlapping ranges can never wait on each other
+        for day in busy:
+            data = self._fetch_one(job._replace(start_date=day, end_date=day), fetch, url)
+            if data is None:
+                return None
+            parts[day] = data
+        return _merge_days([parts[day] for day in days])
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self) -> "WeatherCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
 def save_as_json(data: Dict[str, Union[str, float]], filename: str = "weather_data.json") -> None:
     """
     Save weather data to a JSON file.
@@ -88,6 +527,160 @@ def save_as_json(data: Dict[str, Union[str, float]], filename: str = "weather_da
     print(f"Data saved to {filename}")
 
 
+def _column_dtype(name: str) -> np.dtype:
+    """Return the little-endian on-disk dtype of a column."""
+    return np.dtype("<i8") if name == TIME_COLUMN else np.dtype("<f8")
+
+
+def _hourly_columns(data: Dict) -> Dict[str, np.ndarray]:
+    """Convert the hourly arrays of a response to NumPy columns; missing values become NaN."""
+    columns = {}
+    for name, values in data.get("hourly", {}).items():
+        if name == TIME_COLUMN:
+            columns[name] = np.asarray(values, dtype=_column_dtype(name))
+        else:
+            columns[name] = np.array([np.nan if v is None else v for v in values], dtype=_column_dtype(name))
+    return columns
+
+
+def site_name(data: Dict) -> str:
+    """Name a site after the latitude and longitude of a response."""
+    return f"{data['latitude']}_{data['longitude']}"
+
+
+def save_as_npz(data: Dict, filename: str = "weather_data.npz") -> None:
+    """
+    Save the hourly arrays of weather data to an uncompressed NumPy .npz file.
+
+    Parameters
+    ----------
+    data : dict
+        Weather data in JSON format.
+    filename : str, optional
+        The name of the file. Defaults to "weather_data.npz".
+
+    """
+    np.savez(filename, **_hourly_columns(data))
+    print(f"Data saved to {filename}")
+
+
+def load_npz(filename: str) -> Dict[str, np.ndarray]:
+    """Load the columns saved by save_as_npz; each column is read only when accessed."""
+    return np.load(filename)
+
+
+def save_as_parquet(data: Dict, filename: str = "weather_data.parquet") -> None:
+    """
+    Save the hourly arrays of weather data to a Parquet file.
+
+    Parameters
+    ----------
+    data : dict
+        Weather data in JSON format.
+    filename : str, optional
+        The name of the file. Defaults to "weather_data.parquet".
+
+    Raises
+    ------
+    ImportError
+        If pyarrow is not installed.
+
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pq.write_table(pa.table(_hourly_columns(data)), filename)
+    print(f"Data saved to {filename}")
+
+
+def append_to_dataset(data: Dict, directory: str, site: Optional[str] = None) -> int:
+    """
+    Append the hourly arrays of weather data to a per-site columnar dataset.
+
+    Each site is a directory holding one raw little-endian file per column
+    (<column>.bin). Rows not newer than the last stored timestamp are skipped,
+    so overlapping responses can be appended safely. Columns left longer than the
+    others by an interrupted append are truncated before appending.
+
+    Parameters
+    ----------
+    data : dict
+        Weather data in JSON format.
+    directory : str
+        Root directory of the dataset.
+    site : str, optional
+        Site name. Defaults to site_name(data).
+
+    Returns
+    -------
+    int
+        Number of rows appended.
+
+    Raises
+    ------
+    ValueError
+        If the response has different columns than the stored site.
+
+    """
+    site = site or site_name(data)
+    site_dir = os.path.join(directory, site)
+    os.makedirs(site_dir, exist_ok=True)
+    columns = _hourly_columns(data)
+    stored = load_site(directory, site)
+    if stored and set(stored) != set(columns):
+        raise ValueError(f"Columns {sorted(columns)} do not match stored columns {sorted(stored)}")
+    rows = len(stored[TIME_COLUMN]) if stored else 0
+    if rows:
+        keep = columns[TIME_COLUMN] > stored[TIME_COLUMN][-1]
+        columns = {name: values[keep] for name, values in columns.items()}
+    del stored  # release the memory maps before appending
+    for name, values in columns.items():
+        path = os.path.join(site_dir, name + COLUMN_SUFFIX)
+        if os.path.exists(path) and os.path.getsize(path) > rows * values.itemsize:
+            os.truncate(path, rows * values.itemsize)
+        with open(path, "ab") as column_file:
+            column_file.write(values.tobytes())
+    return len(columns.get(TIME_COLUMN, ()))
+
+
+def load_site(directory: str, site: str) -> Dict[str, np.ndarray]:
+    """
+    Memory-map the columns of one site of a dataset written by append_to_dataset.
+
+    If an interrupted append left the columns with different lengths, all of them
+    are cut to the shortest, so the rows stay aligned.
+
+    Parameters
+    ----------
+    directory : str
+        Root directory of the dataset.
+    site : str
+        Site name.
+
+    Returns
+    -------
+    dict
+        Read-only arrays by column name, empty if the site does not exist.
+
+    """
+    site_dir = os.path.join(directory, site)
+    if not os.path.isdir(site_dir):
+        return {}
+    lengths = {}
+    for entry in sorted(os.listdir(site_dir)):
+        if entry.endswith(COLUMN_SUFFIX):
+            name = entry[: -len(COLUMN_SUFFIX)]
+            lengths[name] = os.path.getsize(os.path.join(site_dir, entry)) // _column_dtype(name).itemsize
+    rows = min(lengths.values(), default=0)
+    columns = {}
+    for name in lengths:
+        if rows == 0:
+            columns[name] = np.empty(0, dtype=_column_dtype(name))  # np.memmap cannot map empty files
+        else:
+            columns[name] = np.memmap(os.path.join(site_dir, name + COLUMN_SUFFIX),
+                                      dtype=_column_dtype(name), mode="r", shape=(rows,))
+    return columns
+
 if __name__ == "__main__":
     # Example usage
     latitude = 50.088
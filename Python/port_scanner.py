@@ -12,14 +12,40 @@ includes capabilities to scan a range of ports on each target to identify open p
 for scanning multiple targets by accepting a comma-separated list of IP addresses. The user can specify 
 the range of ports to scan for each target.
 
+Constants:
+- PROBE_TIMEOUT: Seconds to wait for a connection before a port is reported as filtered.
+- CONCURRENCY: Default number of probes in flight in the asyncio engine.
+- SWEEP_RUNS: Default number of differential runs a full port sweep is spread over.
+- CHANGE_WINDOW: Seconds a state change keeps its port block in every differential run.
+- BLOCK_SIZE: Width of the port blocks rescanned around recent changes.
+
+Classes:
+- ProbeResult: Outcome of probing one port.
+- Change: A port whose state differs from the stored one.
+- ScanStore: SQLite store of the latest state of every probed port and of state changes.
+
 Functions:
 - scan(target: str, ports: int): Initiates a port scan on the specified target for the given range of ports.
 - scan_port(ipaddress: str, port: int): Scans a specific port on the given IP address and reports its status.
+- parse_ports(spec: str): Parses a port specification such as "22,80,8000-8100".
+- probe_port(target: str, port: int, timeout: float): Coroutine probing one port with asyncio.open_connection.
+- scan_async(targets, ports, concurrency, timeout): Coroutine probing many targets and ports concurrently.
+- scan_targets(targets, ports, concurrency, timeout): Runs scan_async and prints the open ports.
+- plan_differential(store, target, ports, sweep_runs): Orders the ports of a differential run.
+- differential_scan(targets, ports, store, ...): Probes the planned ports and records the changes.
 
 Usage:
 Run the script and enter the targets and the number of ports to scan when prompted. The script will display 
 the status of each port (open or closed) for each target IP address.
 
+Pass the targets on the command line to use the asyncio engine non-interactively instead:
+    $ python port_scanner.py 127.0.0.1,192.168.1.2 --ports 1-1024,8080 --concurrency 500 --timeout 1
+
+Add --db to record the results in a ScanStore and --diff for a differential run: known-open
+ports and blocks with recent changes are probed first, the full sweep is spread over
+--sweep-runs runs and only changed ports are reported. --output writes the probed results
+as JSON lines.
+
 Note:
 - The script requires the 'socket' and 'termcolor' modules.
 - Port scanning can be illegal or considered hostile activity on certain networks. Ensure you have 
@@ -34,9 +60,40 @@ Example:
 
 """
 
+import argparse
+import asyncio
+import json
 import socket
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Third-party imports
 import termcolor
 
+PROBE_TIMEOUT: float = 1.0
+CONCURRENCY: int = 500
+SWEEP_RUNS: int = 7
+CHANGE_WINDOW: float = 7 * 24 * 3600.0
+BLOCK_SIZE: int = 256
+
+
+class ProbeResult(NamedTuple):
+    """Outcome of probing one port: state is 'open', 'closed' or 'filtered'."""
+    target: str
+    port: int
+    state: str
+    latency: float
+
+
+class Change(NamedTuple):
+    """A port whose state differs from the stored one; previous is None if never probed."""
+    target: str
+    port: int
+    previous: Optional[str]
+    state: str
+
 
 def scan(target: str, ports: int) -> None:
     """
@@ -63,7 +120,7 @@ def scan(target: str, ports: int) -> None:
         print(termcolor.colored("\n[!] Scan interrupted by user. Exiting...", "red"))
 
 
-def scan_port(ipaddress: str, port: int) -> None:
+def scan_port(ipaddress: str, port: int, timeout: Optional[float] = PROBE_TIMEOUT) -> None:
     """
     Scan a specific port on the given IP address.
 
@@ -73,6 +130,8 @@ def scan_port(ipaddress: str, port: int) -> None:
         The target IP address.
     port : int
         The port number to scan.
+    timeout : float, optional
+        Seconds to wait for the connection, or None to block. Defaults to PROBE_TIMEOUT.
 
     Returns
     -------
@@ -80,16 +139,446 @@ def scan_port(ipaddress: str, port: int) -> None:
 
     """
 
+    sock = socket.socket()  # Initiate socket object
+    sock.settimeout(timeout)
     try:
-        sock = socket.socket()  # Initiate socket object
         sock.connect((ipaddress, port))
         print(termcolor.colored(f"[+] Port {port} open", "green"))
-        socket.close()
-    except:
+    except OSError:
         print(termcolor.colored(f"[-] Port {port} closed", "red"))
+    finally:
+        sock.close()
+
+
+def parse_ports(spec: str) -> List[int]:
+    """
+    Parse a port specification into a sorted list of ports.
+
+    Parameters
+    ----------
+    spec : str
+        Comma-separated ports and inclusive ranges, e.g. "22,80,8000-8100".
+
+    Returns
+    -------
+    list of int
+        The ports, without duplicates.
+
+    Raises
+    ------
+    ValueError
+        If a port is not a number in the range 1-65535.
+
+    """
+    ports = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        start, end = int(first), int(last or first)
+        if not 1 <= start <= end <= 65535:
+            raise ValueError(f"Invalid port range: {part}")
+        ports.update(range(start, end + 1))
+    return sorted(ports)
+
+
+async def probe_port(target: str, port: int, timeout: float = PROBE_TIMEOUT) -> ProbeResult:
+    """
+    Probe one port with a TCP connect.
+
+    Parameters
+    ----------
+    target : str
+        The target host.
+    port : int
+        The port number to probe.
+    timeout : float, optional
+        Seconds to wait for the connection. Defaults to PROBE_TIMEOUT.
+
+    Returns
+    -------
+    ProbeResult
+        'open' if the connection succeeded, 'closed' if it was refused or failed,
+        'filtered' if it timed out.
+
+    """
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(target, port), timeout)
+    except asyncio.TimeoutError:
+        return ProbeResult(target, port, "filtered", time.perf_counter() - start)
+    except OSError:
+        return ProbeResult(target, port, "closed", time.perf_counter() - start)
+    latency = time.perf_counter() - start
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return ProbeResult(target, port, "open", latency)
+
+
+async def scan_async(
+    targets: Iterable[str],
+    ports: Iterable[int],
+    concurrency: int = CONCURRENCY,
+    timeout: float = PROBE_TIMEOUT,
+    callback: Optional[Callable[[ProbeResult], None]] = None,
+) -> List[ProbeResult]:
+    """
+    Probe every port of every target with bounded concurrency.
+
+    Probes are started lazily as earlier ones finish, so memory does not grow with
+    the number of targets and ports.
+
+    Parameters
+    ----------
+    targets : iterable of str
+        The target hosts.
+    ports : iterable of int
+        The ports to probe on each target.
+    concurrency : int, optional
+        Maximum number of probes in flight. Defaults to CONCURRENCY.
+    timeout : float, optional
+        Per-probe timeout in seconds. Defaults to PROBE_TIMEOUT.
+    callback : callable, optional
+        Called with each ProbeResult as soon as it is known.
+
+    Returns
+    -------
+    list of ProbeResult
+        The results, sorted by target and port.
+
+    """
+    ports = list(ports)
+    probes = ((target, port) for target in targets for port in ports)
+    return await _run_probes(probes, concurrency, timeout, callback)
+
+
+async def _run_probes(
+    probes: Iterable[Tuple[str, int]],
+    concurrency: int,
+    timeout: float,
+    callback: Optional[Callable[[ProbeResult], None]],
+) -> List[ProbeResult]:
+    """Probe (target, port) pairs in the given order with at most concurrency in flight."""
+    results: List[ProbeResult] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = set()
+
+    async def run(target: str, port: int) -> None:
+        try:
+            result = await probe_port(target, port, timeout)
+        finally:
+            semaphore.release()
+        results.append(result)
+        if callback:
+            callback(result)
+
+    try:
+        for target, port in probes:
+            await semaphore.acquire()
+            task = asyncio.ensure_future(run(target, port))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+    finally:
+        for task in pending:
+            task.cancel()
+    return sorted(results, key=lambda r: (r.target, r.port))
+
+
+def scan_targets(
+    targets: Iterable[str],
+    ports: Iterable[int],
+    concurrency: int = CONCURRENCY,
+    timeout: float = PROBE_TIMEOUT,
+    show_closed: bool = False,
+) -> List[ProbeResult]:
+    """
+    Scan targets with the asyncio engine and print the results as they arrive.
+
+    Parameters
+    ----------
+    targets : iterable of str
+        The target hosts.
+    ports : iterable of int
+        The ports to probe on each target.
+    concurrency : int, optional
+        Maximum number of probes in flight. Defaults to CONCURRENCY.
+    timeout : float, optional
+        Per-probe timeout in seconds. Defaults to PROBE_TIMEOUT.
+    show_closed : bool, optional
+        Also print closed and filtered ports. Defaults to False.
+
+    Returns
+    -------
+    list of ProbeResult
+        The results, sorted by target and port.
+
+    """
+    def report(result: ProbeResult) -> None:
+        if result.state == "open":
+            print(termcolor.colored(f"[+] Port {result.port} open on {result.target} ({result.latency * 1000:.1f} ms)", "green"))
+        elif show_closed:
+            print(termcolor.colored(f"[-] Port {result.port} {result.state} on {result.target}", "red"))
+
+    return asyncio.run(scan_async(targets, ports, concurrency, timeout, report))
+
+
+def write_jsonl(results: Iterable[ProbeResult], path: str, timestamp: Optional[float] = None) -> None:
+    """Append results to a JSON lines file, one object per probe."""
+    timestamp = time.time() if timestamp is None else timestamp
+    with open(path, "a") as f:
+        for result in results:
+            f.write(json.dumps({**result._asdict(), "timestamp": timestamp}) + "\n")
+
+
+class ScanStore:
+    """
+    SQLite store of scan results.
+
+    The ports table keeps the latest state, latency and probe time of every probed
+    (target, port); the changes table keeps a history of state changes and the sweeps
+    table the position of each target's spread-out full sweep.
+
+    Methods
+    -------
+    record(results: Iterable[ProbeResult], timestamp: Optional[float] = None)
+        Stores results and returns the Changes they make.
+    latest(target: str)
+        Returns the stored state of every probed port of target.
+    recent_changes(target: str, since: float)
+        Returns the ports of target whose state changed at or after since.
+    next_sweep(target: str, ports: List[int], count: int)
+        Returns the next count ports of the full sweep of target and advances it.
+    close()
+        Closes the database.
+
+    """
+
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+        path : str
+            SQLite database file, created if missing.
+
+        """
+        self._db = sqlite3.connect(path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS ports (
+                target TEXT, port INTEGER, state TEXT, latency REAL, timestamp REAL,
+                PRIMARY KEY (target, port)
+            );
+            CREATE TABLE IF NOT EXISTS changes (
+                target TEXT, port INTEGER, previous TEXT, state TEXT, timestamp REAL
+            );
+            CREATE INDEX IF NOT EXISTS changes_by_target ON changes (target, timestamp);
+            CREATE TABLE IF NOT EXISTS sweeps (target TEXT PRIMARY KEY, position INTEGER);
+            """
+        )
+
+    def record(self, results: Iterable[ProbeResult], timestamp: Optional[float] = None) -> List[Change]:
+        """
+        Store results as the latest state of their ports.
+
+        Parameters
+        ----------
+        results : iterable of ProbeResult
+            The probes to store.
+        timestamp : float, optional
+            Probe time as a Unix timestamp. Defaults to now.
+
+        Returns
+        -------
+        list of Change
+            Ports whose state differs from the stored one. Ports probed for the first
+            time count as changed only if they are open.
+
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        changes = []
+        with self._db:
+            for result in results:
+                row = self._db.execute(
+                    "SELECT state FROM ports WHERE target = ? AND port = ?", (result.target, result.port)
+                ).fetchone()
+                previous = row[0] if row else None
+                if previous != result.state and (previous is not None or result.state == "open"):
+                    changes.append(Change(result.target, result.port, previous, result.state))
+                    self._db.execute(
+                        "INSERT INTO changes VALUES (?, ?, ?, ?, ?)",
+                        (result.target, result.port, previous, result.state, timestamp),
+                    )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ports VALUES (?, ?, ?, ?, ?)",
+                    (result.target, result.port, result.state, result.latency, timestamp),
+                )
+        return changes
+
+    def latest(self, target: str) -> Dict[int, Tuple[str, float, float]]:
+        """Return {port: (state, latency, timestamp)} for every probed port of target."""
+        rows = self._db.execute("SELECT port, state, latency, timestamp FROM ports WHERE target = ?", (target,))
+        return {port: (state, latency, timestamp) for port, state, latency, timestamp in rows}
+
+    def recent_changes(self, target: str, since: float) -> List[int]:
+        """Return the ports of target whose state changed at or after since."""
+        rows = self._db.execute(
+            "SELECT DISTINCT port FROM changes WHERE target = ? AND timestamp >= ? ORDER BY port", (target, since)
+        )
+        return [port for (port,) in rows]
+
+    def next_sweep(self, target: str, ports: List[int], count: int) -> List[int]:
+        """Return the next count ports of the full sweep of target, wrapping around, and advance it."""
+        if not ports:
+            return []
+        with self._db:
+            row = self._db.execute("SELECT position FROM sweeps WHERE target = ?", (target,)).fetchone()
+            position = (row[0] if row else 0) % len(ports)
+            count = min(count, len(ports))
+            self._db.execute("INSERT OR REPLACE INTO sweeps VALUES (?, ?)", (target, (position + count) % len(ports)))
+        return (ports[position:] + ports[:position])[:count]
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+
+def plan_differential(
+    store: ScanStore,
+    target: str,
+    ports: List[int],
+    sweep_runs: int = SWEEP_RUNS,
+    change_window: float = CHANGE_WINDOW,
+) -> List[int]:
+    """
+    Order the ports a differential run probes on target.
+
+    Known-open ports come first, then the BLOCK_SIZE-wide blocks around ports that
+    changed within change_window, then the next 1/sweep_runs of the full sweep.
+
+    Parameters
+    ----------
+    store : ScanStore
+        Results of earlier runs.
+    target : str
+        The target host.
+    ports : list of int
+        All ports in scope.
+    sweep_runs : int, optional
+        Number of runs a full sweep is spread over. Defaults to SWEEP_RUNS.
+    change_window : float, optional
+        Seconds a change keeps its block in every run. Defaults to CHANGE_WINDOW.
+
+    Returns
+    -------
+    list of int
+        The ports to probe, without duplicates, in probing order.
+
+    """
+    in_scope = set(ports)
+    known_open = [port for port, (state, _, _) in sorted(store.latest(target).items()) if state == "open"]
+    blocks = {port // BLOCK_SIZE for port in store.recent_changes(target, time.time() - change_window)}
+    changed = [port for port in ports if port // BLOCK_SIZE in blocks]
+    sweep = store.next_sweep(target, ports, -(-len(ports) // max(1, sweep_runs)))
+    plan = dict.fromkeys(port for port in known_open + changed + sweep if port in in_scope)
+    return list(plan)
+
+
+def differential_scan(
+    targets: Iterable[str],
+    ports: Iterable[int],
+    store: ScanStore,
+    sweep_runs: int = SWEEP_RUNS,
+    concurrency: int = CONCURRENCY,
+    timeout: float = PROBE_TIMEOUT,
+) -> Tuple[List[ProbeResult], List[Change]]:
+    """
+    Run a differential scan and record it in store.
+
+    Parameters
+    ----------
+    targets : iterable of str
+        The target hosts.
+    ports : iterable of int
+        All ports in scope.
+    store : ScanStore
+        Results of earlier runs, updated with this run.
+    sweep_runs : int, optional
+        Number of runs a full sweep is spread over. Defaults to SWEEP_RUNS.
+    concurrency : int, optional
+        Maximum number of probes in flight. Defaults to CONCURRENCY.
+    timeout : float, optional
+        Per-probe timeout in seconds. Defaults to PROBE_TIMEOUT.
+
+    Returns
+    -------
+    tuple of (list of ProbeResult, list of Change)
+        The probed results sorted by target and port, and the changes they revealed.
+
+    """
+    ports = sorted(set(ports))
+    probes = [(target, port) for target in targets for port in plan_differential(store, target, ports, sweep_runs)]
+    results = asyncio.run(_run_probes(probes, concurrency, timeout, None))
+    return results, store.record(results)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Scan TCP ports of one or more targets.")
+    parser.add_argument("targets", help="comma-separated target hosts")
+    parser.add_argument("-p", "--ports", default="1-1024", help="ports and ranges, e.g. 22,80,8000-8100")
+    parser.add_argument("-c", "--concurrency", type=int, default=CONCURRENCY, help="probes in flight")
+    parser.add_argument("-t", "--timeout", type=float, default=PROBE_TIMEOUT, help="per-probe timeout in seconds")
+    parser.add_argument("--show-closed", action="store_true", help="also print closed and filtered ports")
+    parser.add_argument("--db", help="SQLite file to record results in")
+    parser.add_argument("--diff", action="store_true", help="differential run against --db, reporting changes only")
+    parser.add_argument("--sweep-runs", type=int, default=SWEEP_RUNS, help="runs a full differential sweep is spread over")
+    parser.add_argument("--output", help="write the probed results to this JSON lines file")
+    args = parser.parse_args(argv)
+    if args.diff and not args.db:
+        parser.error("--diff requires --db")
+
+    targets = [target.strip() for target in args.targets.split(",") if target.strip()]
+    try:
+        ports = parse_ports(args.ports)
+    except ValueError as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+    store = ScanStore(args.db) if args.db else None
+    try:
+        if args.diff:
+            results, changes = differential_scan(
+                targets, ports, store, args.sweep_runs, args.concurrency, args.timeout
+            )
+            for change in changes:
+                color = "green" if change.state == "open" else "red"
+                print(termcolor.colored(
+                    f"[!] Port {change.port} on {change.target}: {change.previous or 'unknown'} -> {change.state}", color
+                ))
+        else:
+            results = scan_targets(targets, ports, args.concurrency, args.timeout, args.show_closed)
+            if store:
+                store.record(results)
+    except KeyboardInterrupt:
+        print(termcolor.colored("\n[!] Scan interrupted by user. Exiting...", "red"))
+        return
+    finally:
+        if store:
+            store.close()
+    if args.output:
+        write_jsonl(results, args.output)
+    open_ports = sum(result.state == "open" for result in results)
+    print(f"[*] {len(results)} probes, {open_ports} open, in {time.perf_counter() - start:.2f}s")
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+        sys.exit()
     targets = input("[*] Enter Targets To Scan (split them by comma): ")
     ports = int(input("[*] Enter How Many Ports To Scan: "))
     try:
@@ -1,5 +1,16 @@
 #!/usr/bin/env python3
 
+from collections import deque
+import mmap
+from multiprocessing import shared_memory
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+import numpy as np
 from termcolor import colored
 
 class RingBuffer:
@@ -18,6 +29,11 @@ class RingBuffer:
         The maximum capacity of the buffer.
     buffer : list
         The list representing the buffer contents.
+    track_stats : bool
+        Whether window aggregates are maintained on every update.
+    sum, mean, variance, stddev, min, max : float
+        Aggregates over the current window, available with track_stats=True.
+        Each is updated in O(1) amortized time per enqueue/dequeue.
 
     Methods
     -------
@@ -38,7 +54,7 @@ class RingBuffer:
 
     """
 
-    def __init__(self, capacity: int):
+    def __init__(self, capacity: int, track_stats: bool = False):
         """
         Constructs all the necessary attributes for the RingBuffer object.
 
@@ -46,6 +62,9 @@ class RingBuffer:
         ----------
         capacity : int
             The maximum number of items the buffer can hold.
+        track_stats : bool, optional
+            Maintain running sum, sum of squares and monotonic min/max deques
+            so window aggregates are available without a scan. Defaults to False.
 
         """
         self.head = 0
@@ -53,6 +72,14 @@ class RingBuffer:
         self.size = 0
         self.capacity = capacity
         self.buffer = [None]*capacity
+        self.track_stats = track_stats
+        if track_stats:
+            self._pushed = 0
+            self._sum = 0.0
+            self._sum_sq = 0.0
+            # (sequence number, value) pairs, values increasing / decreasing
+            self._min_deque = deque()
+            self._max_deque = deque()
 
 
     def enBuffer(self, value: int) -> None:
@@ -73,6 +100,8 @@ class RingBuffer:
         self.buffer[self.tail] = value
         self.tail = (self.tail + 1) % self.capacity
         self.size = min(self.size + 1, self.capacity)
+        if self.track_stats:
+            self._stats_push(value)
         return True
 
     def deBuffer(self) -> None:
@@ -90,6 +119,8 @@ class RingBuffer:
         """
         if self.isEmpty(): 
             raise ValueError("Cannot dequeue from an empty buffer")
+        if self.track_stats:
+            self._stats_pop(self.buffer[self.head])
         self.head = (self.head+1)%self.capacity
         self.size -= 1
         return True
@@ -140,6 +171,73 @@ class RingBuffer:
         """ Checks if the buffer is full. """
         return self.size == self.capacity
     
+    def _stats_push(self, value) -> None:
+        """ Adds a newly enqueued value to the running aggregates. """
+        seq = self._pushed
+        self._pushed += 1
+        self._sum += value
+        self._sum_sq += value * value
+        while self._min_deque and self._min_deque[-1][1] >= value:
+            self._min_deque.pop()
+        self._min_deque.append((seq, value))
+        while self._max_deque and self._max_deque[-1][1] <= value:
+            self._max_deque.pop()
+        self._max_deque.append((seq, value))
+
+    def _stats_pop(self, value) -> None:
+        """ Removes the oldest value from the running aggregates. """
+        seq = self._pushed - self.size
+        self._sum -= value
+        self._sum_sq -= value * value
+        if self._min_deque[0][0] == seq:
+            self._min_deque.popleft()
+        if self._max_deque[0][0] == seq:
+            self._max_deque.popleft()
+
+    def _check_stats(self) -> None:
+        """ Ensures aggregates are enabled and the window is not empty. """
+        if not self.track_stats:
+            raise ValueError("Aggregates are disabled, create the buffer with track_stats=True")
+        if self.isEmpty():
+            raise ValueError("Cannot compute aggregates of an empty buffer")
+
+    @property
+    def sum(self) -> float:
+        """ Sum of the values in the buffer. """
+        self._check_stats()
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        """ Arithmetic mean of the values in the buffer. """
+        self._check_stats()
+        return self._sum / self.size
+
+    @property
+    def variance(self) -> float:
+        """ Population variance of the values in the buffer. """
+        self._check_stats()
+        mean = self._sum / self.size
+        # Clamp the rounding error of the sum-of-squares formula
+        return max(0.0, self._sum_sq / self.size - mean * mean)
+
+    @property
+    def stddev(self) -> float:
+        """ Population standard deviation of the values in the buffer. """
+        return self.variance ** 0.5
+
+    @property
+    def min(self):
+        """ Smallest value in the buffer. """
+        self._check_stats()
+        return self._min_deque[0][1]
+
+    @property
+    def max(self):
+        """ Largest value in the buffer. """
+        self._check_stats()
+        return self._max_deque[0][1]
+
     def display(self):
         """ Display the current state of the buffer. """
         buffer_visual = [colored("[ ]", "white") for _ in range(self.capacity)]
@@ -148,8 +246,951 @@ class RingBuffer:
             buffer_visual[idx] = colored(f"[{self.buffer[idx]}]", "green")
             idx = (idx + 1) % self.capacity
         print("Buffer State: " + ' '.join(buffer_visual))
-    
+
+class ArrayRingBuffer(RingBuffer):
+    """
+    A typed ring buffer backed by a NumPy array.
+
+    Values are stored unboxed in a preallocated array of the given dtype. Bulk
+    operations move data with at most two contiguous slice copies, and window
+    reads return views into the storage whenever the data does not wrap.
+
+    Attributes
+    ----------
+    dtype : numpy.dtype
+        The element type of the buffer.
+
+    Methods
+    -------
+    extend(values)
+        Appends an array of values, overwriting the oldest ones on overflow.
+    pop_many(n: int) -> numpy.ndarray
+        Removes and returns up to n of the oldest values.
+    view() -> numpy.ndarray
+        Returns all stored values, oldest first.
+    latest(n: int) -> numpy.ndarray
+        Returns the n most recent values, oldest first.
+
+    """
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        """
+        Constructs the array-backed buffer.
+
+        Parameters
+        ----------
+        capacity : int
+            The maximum number of items the buffer can hold.
+        dtype : numpy.dtype, optional
+            The element type of the buffer. Defaults to float64.
+
+        """
+        super().__init__(0)
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self.buffer = np.zeros(capacity, dtype=self.dtype)
+
+    def enBuffer(self, value) -> None:
+        """
+        Enqueues a single value at the tail of the buffer.
+
+        Same semantics as RingBuffer.enBuffer, without the modulo per push.
+
+        Parameters
+        ----------
+        value : scalar
+            The value to be added to the buffer.
+
+        """
+        self.buffer[self.tail] = value
+        self.tail += 1
+        if self.tail == self.capacity:
+            self.tail = 0
+        if self.size == self.capacity:
+            self.head = self.tail
+        else:
+            self.size += 1
+        return True
+
+    def extend(self, values) -> None:
+        """
+        Enqueues an array of values at the tail of the buffer.
+
+        If the values do not fit, the oldest elements are overwritten. When more
+        than capacity values are given, only the last capacity of them are kept.
+
+        Parameters
+        ----------
+        values : array_like
+            The values to be added to the buffer.
+
+        """
+        values = np.asarray(values, dtype=self.dtype).reshape(-1)
+        n = len(values)
+        if n == 0:
+            return
+        self._store(self.buffer, values)
+        if n >= self.capacity:
+            self.head = 0
+            self.tail = 0
+            self.size = self.capacity
+            return
+
+        self.tail = (self.tail + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        self.head = (self.tail - self.size) % self.capacity
+
+    def pop_many(self, n: int) -> np.ndarray:
+        """
+        Dequeues up to n of the oldest values from the buffer.
+
+        The values are copied out, since their slots may be overwritten by later
+        enqueues.
+
+        Parameters
+        ----------
+        n : int
+            The maximum number of values to remove.
+
+        Returns
+        -------
+        numpy.ndarray
+            The removed values, oldest first. Empty if the buffer is empty.
+
+        """
+        n = max(0, min(n, self.size))
+        first, second = self._slices(self.head, n)
+        result = np.empty(n, dtype=self.dtype)
+        result[:len(first)] = first
+        result[len(first):] = second
+
+        self.head = (self.head + n) % self.capacity
+        self.size -= n
+        return result
+
+    def view(self) -> np.ndarray:
+        """
+        Returns all stored values, oldest first.
+
+        The result is a view into the buffer when the data is contiguous, so it
+        reflects later writes; otherwise it is a single copy of both segments.
+
+        Returns
+        -------
+        numpy.ndarray
+            The contents of the buffer.
+
+        """
+        return self._window(self.head, self.size)
+
+    def latest(self, n: int) -> np.ndarray:
+        """
+        Returns the n most recent values, oldest first.
+
+        Like view(), this avoids copying unless the window wraps around.
+
+        Parameters
+        ----------
+        n : int
+            The number of values to return. Clamped to the current size.
+
+        Returns
+        -------
+        numpy.ndarray
+            The most recent values in the buffer.
+
+        """
+        n = max(0, min(n, self.size))
+        return self._window((self.tail - n) % self.capacity, n)
+
+    def _store(self, array: np.ndarray, values: np.ndarray) -> None:
+        """ Writes values into array starting at the tail, with at most two slice copies. """
+        n = len(values)
+        if n >= self.capacity:
+            array[:] = values[n - self.capacity:]
+            return
+        first = min(n, self.capacity - self.tail)
+        array[self.tail:self.tail + first] = values[:first]
+        array[:n - first] = values[first:]
+
+    def _slices(self, start: int, count: int, array: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """ Splits a logical window of array (the buffer by default) into its two physical segments. """
+        array = self.buffer if array is None else array
+        end = start + count
+        if end <= self.capacity:
+            return array[start:end], array[:0]
+        return array[start:], array[:end - self.capacity]
+
+    def _window(self, start: int, count: int, array: Optional[np.ndarray] = None) -> np.ndarray:
+        """ Returns a logical window, copying only if it wraps around. """
+        first, second = self._slices(start, count, array)
+        if len(second) == 0:
+            return first
+        return np.concatenate((first, second))
+
+
+class TimeIndexedRingBuffer(ArrayRingBuffer):
+    """
+    An array-backed ring buffer of timestamped values with range queries.
+
+    Timestamps are kept in a parallel array and must be non-decreasing. The
+    logical contents are at most two sorted physical segments, so a timestamp
+    is located with one np.searchsorted per segment in O(log n), and results
+    are returned as slices like view().
+
+    Attributes
+    ----------
+    times : numpy.ndarray
+        The timestamp storage, parallel to buffer.
+
+    Methods
+    -------
+    enBuffer(timestamp, value)
+        Appends one sample, overwriting the oldest one on overflow.
+    extend(timestamps, values)
+        Appends arrays of samples.
+    timestamps() -> numpy.ndarray
+        Returns all stored timestamps, oldest first.
+    since(t) -> (numpy.ndarray, numpy.ndarray)
+        Returns the samples with timestamp >= t.
+    between(t0, t1) -> (numpy.ndarray, numpy.ndarray)
+        Returns the samples with t0 <= timestamp <= t1.
+    at_or_before(t) -> (timestamp, value) or None
+        Returns the latest sample with timestamp <= t.
+
+    """
+
+    def __init__(self, capacity: int, dtype=np.float64, time_dtype=np.float64):
+        """
+        Constructs the time-indexed buffer.
+
+        Parameters
+        ----------
+        capacity : int
+            The maximum number of samples the buffer can hold.
+        dtype : numpy.dtype, optional
+            The element type of the values. Defaults to float64.
+        time_dtype : numpy.dtype, optional
+            The element type of the timestamps, e.g. int64 or datetime64[ns].
+            Defaults to float64.
+
+        """
+        super().__init__(capacity, dtype)
+        self.times = np.zeros(capacity, dtype=time_dtype)
+
+    def enBuffer(self, timestamp, value) -> None:
+        """
+        Enqueues one sample at the tail of the buffer.
+
+        Parameters
+        ----------
+        timestamp : scalar
+            The sample time, not earlier than the latest stored timestamp.
+        value : scalar
+            The value to be added to the buffer.
+
+        Raises
+        ------
+        ValueError
+            If timestamp is earlier than the latest stored timestamp.
+
+        """
+        if self.size and timestamp < self.times[self.tail - 1]:
+            raise ValueError("Timestamps must be non-decreasing")
+        self.times[self.tail] = timestamp
+        return super().enBuffer(value)
+
+    def extend(self, timestamps, values) -> None:
+        """
+        Enqueues arrays of samples at the tail of the buffer.
+
+        Parameters
+        ----------
+        timestamps : array_like
+            Non-decreasing sample times, not earlier than the latest stored timestamp.
+        values : array_like
+            The values, one per timestamp.
+
+        Raises
+        ------
+        ValueError
+            If the timestamps are out of order or the lengths differ.
+
+        """
+        timestamps = np.asarray(timestamps, dtype=self.times.dtype).reshape(-1)
+        values = np.asarray(values, dtype=self.dtype).reshape(-1)
+        if len(timestamps) != len(values):
+            raise ValueError("timestamps and values must have the same length")
+        if len(timestamps) == 0:
+            return
+        if np.any(timestamps[1:] < timestamps[:-1]) or (self.size and timestamps[0] < self.times[self.tail - 1]):
+            raise ValueError("Timestamps must be non-decreasing")
+        self._store(self.times, timestamps)
+        super().extend(values)
+
+    def timestamps(self) -> np.ndarray:
+        """
+        Returns all stored timestamps, oldest first, like view() does for values.
+
+        Returns
+        -------
+        numpy.ndarray
+            The timestamps in the buffer.
+
+        """
+        return self._window(self.head, self.size, self.times)
+
+    def _search(self, t, side: str) -> int:
+        """ Returns the logical insertion index of t, like np.searchsorted over timestamps(). """
+        first, second = self._slices(self.head, self.size, self.times)
+        index = int(np.searchsorted(first, t, side))
+        if index < len(first):
+            return index
+        return index + int(np.searchsorted(second, t, side))
+
+    def _samples(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the samples at logical indices [start, stop). """
+        begin = (self.head + start) % self.capacity
+        count = max(0, stop - start)
+        return self._window(begin, count, self.times), self._window(begin, count)
+
+    def since(self, t) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the samples with timestamp >= t.
+
+        Parameters
+        ----------
+        t : scalar
+            The earliest timestamp to include.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            The timestamps and values, oldest first. Views into the buffer unless
+            the range wraps around.
+
+        """
+        return self._samples(self._search(t, "left"), self.size)
+
+    def between(self, t0, t1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the samples with t0 <= timestamp <= t1.
+
+        Parameters
+        ----------
+        t0 : scalar
+            The earliest timestamp to include.
+        t1 : scalar
+            The latest timestamp to include.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            The timestamps and values, oldest first. Views into the buffer unless
+            the range wraps around.
+
+        """
+        return self._samples(self._search(t0, "left"), self._search(t1, "right"))
+
+    def at_or_before(self, t) -> Optional[Tuple[Any, Any]]:
+        """
+        Returns the latest sample with timestamp <= t.
+
+        Parameters
+        ----------
+        t : scalar
+            The timestamp to look up.
+
+        Returns
+        -------
+        tuple or None
+            The (timestamp, value) of the sample, or None if every stored sample
+            is later than t.
+
+        """
+        index = self._search(t, "right") - 1
+        if index < 0:
+            return None
+        slot = (self.head + index) % self.capacity
+        return self.times[slot], self.buffer[slot]
+
+
+class ConcurrentRingBuffer:
+    """
+    A bounded ring buffer queue for passing items between threads.
+
+    In the default single-producer/single-consumer (SPSC) mode no lock is shared
+    between the two sides. Fullness and emptiness are derived from two ever
+    increasing counters: the producer only advances tail and the consumer only
+    advances head, and each slot is written before the counter that publishes
+    it. In multi-producer mode the producers serialize on a lock among
+    themselves, while the consumer stays lock-free.
+
+    Unlike RingBuffer.enBuffer, put never overwrites unread items; it waits for
+    space or fails instead.
+
+    Attributes
+    ----------
+    head : int
+        The total number of items consumed so far.
+    tail : int
+        The total number of items produced so far.
+    capacity : int
+        The maximum capacity of the buffer.
+    buffer : list
+        The list representing the buffer contents.
+    multi_producer : bool
+        Whether put may be called from several threads at once.
+
+    Methods
+    -------
+    try_put(value: Any) -> bool
+        Adds a value if there is room, without waiting.
+    try_get() -> tuple
+        Removes the oldest value if there is one, without waiting.
+    put(value: Any, block: bool = True, timeout: float = None)
+        Adds a value, waiting for room if necessary.
+    get(block: bool = True, timeout: float = None) -> Any
+        Removes and returns the oldest value, waiting if necessary.
+    qsize() -> int
+        Returns the current number of items in the buffer.
+
+    """
+
+    # Upper bound of the back-off sleep while waiting, in seconds
+    MAX_WAIT_SLEEP: float = 0.001
+
+    def __init__(self, capacity: int, multi_producer: bool = False):
+        """
+        Constructs all the necessary attributes for the ConcurrentRingBuffer object.
+
+        Parameters
+        ----------
+        capacity : int
+            The maximum number of items the buffer can hold.
+        multi_producer : bool, optional
+            Allow several producer threads. Defaults to False (SPSC).
+
+        """
+        self.head = 0
+        self.tail = 0
+        self.capacity = capacity
+        self.buffer = [None]*capacity
+        self.multi_producer = multi_producer
+        self._producer_lock = threading.Lock() if multi_producer else None
+
+    def qsize(self) -> int:
+        """ Returns the current number of items in the buffer. """
+        return self.tail - self.head
+
+    def isEmpty(self) -> bool:
+        """ Checks if the buffer is empty. """
+        return self.tail == self.head
+
+    def isFull(self) -> bool:
+        """ Checks if the buffer is full. """
+        return self.tail - self.head >= self.capacity
+
+    def try_put(self, value: Any) -> bool:
+        """
+        Enqueues a value at the tail of the buffer if there is room.
+
+        Parameters
+        ----------
+        value : Any
+            The value to be added to the buffer.
+
+        Returns
+        -------
+        bool
+            True if the value was added, False if the buffer is full.
+
+        """
+        if self._producer_lock is None:
+            return self._put_nowait(value)
+        with self._producer_lock:
+            return self._put_nowait(value)
+
+    def try_get(self) -> Tuple[bool, Any]:
+        """
+        Dequeues the oldest value from the buffer if there is one.
+
+        Returns
+        -------
+        tuple
+            (True, value) on success, (False, None) if the buffer is empty.
+
+        """
+        head = self.head
+        if self.tail == head:
+            return False, None
+        idx = head % self.capacity
+        value = self.buffer[idx]
+        self.buffer[idx] = None
+        self.head = head + 1
+        return True, value
+
+    def put(self, value: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Enqueues a value, waiting for room if the buffer is full.
+
+        Parameters
+        ----------
+        value : Any
+            The value to be added to the buffer.
+        block : bool, optional
+            Wait for room instead of failing immediately. Defaults to True.
+        timeout : float, optional
+            The maximum number of seconds to wait. Waits forever if None.
+
+        Raises
+        ------
+        queue.Full
+            If no room became available in time.
+
+        """
+        if self.try_put(value):
+            return
+        if not block:
+            raise queue.Full
+        self._wait(lambda: self.try_put(value), timeout, queue.Full)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """
+        Dequeues and returns the oldest value, waiting if the buffer is empty.
+
+        Parameters
+        ----------
+        block : bool, optional
+            Wait for a value instead of failing immediately. Defaults to True.
+        timeout : float, optional
+            The maximum number of seconds to wait. Waits forever if None.
+
+        Raises
+        ------
+        queue.Empty
+            If no value became available in time.
+
+        Returns
+        -------
+        Any
+            The oldest value in the buffer.
+
+        """
+        ok, value = self.try_get()
+        if ok:
+            return value
+        if not block:
+            raise queue.Empty
+        result = []
+        self._wait(lambda: self._collect(result), timeout, queue.Empty)
+        return result[0]
+
+    def _put_nowait(self, value: Any) -> bool:
+        """ Writes the slot, then publishes it by advancing tail. """
+        tail = self.tail
+        if tail - self.head >= self.capacity:
+            return False
+        self.buffer[tail % self.capacity] = value
+        self.tail = tail + 1
+        return True
+
+    def _collect(self, result: list) -> bool:
+        """ Moves one value into result if available. """
+        ok, value = self.try_get()
+        if ok:
+            result.append(value)
+        return ok
+
+    def _wait(self, attempt, timeout: Optional[float], error: type) -> None:
+        """ Retries attempt with exponential back-off until it succeeds or times out. """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.0
+        while not attempt():
+            if deadline is not None and time.monotonic() >= deadline:
+                raise error
+            time.sleep(delay)
+            delay = min(self.MAX_WAIT_SLEEP, delay * 2 or 1e-6)
+
+
+class SharedRingBuffer:
+    """
+    A ring buffer of fixed-size records living in shared memory.
+
+    The whole state, including the write counter and one read cursor per
+    consumer, is kept in the shared segment, so a producer process and any number
+    of consumer processes can attach to it by name and exchange records without
+    pickling. Every consumer sees every record (fan-out), and the producer never
+    overwrites a record that some consumer has not read yet.
+
+    The segment is either a multiprocessing.shared_memory block or an mmap'd file.
+    With a file, the read cursors survive a consumer restart and the consumer
+    resumes where it stopped.
+
+    Counters are 64-bit words updated by a single writer each (the producer for
+    tail, consumer i for its cursor); records are written before the counter
+    that publishes them.
+
+    Attributes
+    ----------
+    name : str
+        Name of the shared memory block, or the path of the mmap'd file.
+    capacity : int
+        The maximum number of records the buffer can hold.
+    dtype : numpy.dtype
+        The record type. Use a structured dtype for multi-field records.
+    readers : int
+        The number of consumer cursors in the segment.
+    reader : int
+        The cursor used by this handle for reading.
+    buffer : numpy.ndarray
+        The record storage, mapped onto the shared segment.
+
+    Methods
+    -------
+    enBuffer(value) -> bool
+        Adds a single record if there is room.
+    extend(values) -> int
+        Adds as many records as fit and returns how many were written.
+    peek(n: int) -> numpy.ndarray
+        Returns a zero-copy view of up to n unread contiguous records.
+    advance(n: int)
+        Marks n records as read by this consumer.
+    pop_many(n: int) -> numpy.ndarray
+        Copies out and consumes up to n unread records.
+    close()
+        Detaches from the shared segment.
+    unlink()
+        Destroys the shared segment.
+
+    """
+
+    MAGIC: int = 0x52494E47  # "RING"
+    # Header words: magic, capacity, itemsize, readers, tail, then one cursor per reader
+    _FIXED_WORDS: int = 5
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        dtype=np.float64,
+        name: Optional[str] = None,
+        path: Optional[str] = None,
+        create: bool = True,
+        readers: int = 1,
+        reader: int = 0,
+    ):
+        """
+        Creates a new shared segment or attaches to an existing one.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            The maximum number of records. Required when creating.
+        dtype : numpy.dtype, optional
+            The record type; must match between all processes. Defaults to float64.
+        name : str, optional
+            Name of the shared memory block. Generated when creating without a name.
+        path : str, optional
+            Use an mmap'd file at this path instead of shared memory.
+        create : bool, optional
+            Create the segment (True) or attach to an existing one (False).
+        readers : int, optional
+            The number of consumer cursors to allocate when creating. Defaults to 1.
+        reader : int, optional
+            The consumer cursor this handle reads with. Defaults to 0.
+
+        Raises
+        ------
+        ValueError
+            If the parameters do not match the existing segment.
+
+        """
+        self.dtype = np.dtype(dtype)
+        self._shm = None
+        self._mmap = None
+
+        if create:
+            if not capacity or capacity <= 0:
+                raise ValueError("A positive capacity is required to create a buffer")
+            header_size = self._header_size(readers)
+            size = header_size + capacity * self.dtype.itemsize
+            mem = self._open(name, path, size, create=True)
+        else:
+            mem = self._open(name, path, 0, create=False)
+
+        self._header = np.ndarray((self._FIXED_WORDS,), dtype=np.int64, buffer=mem)
+        if create:
+            self._header[:] = (self.MAGIC, capacity, self.dtype.itemsize, readers, 0)
+        elif self._header[0] != self.MAGIC:
+            self.close()
+            raise ValueError(f"'{name or path}' is not a SharedRingBuffer segment")
+        elif self._header[2] != self.dtype.itemsize:
+            self.close()
+            raise ValueError("Record dtype does not match the shared segment")
+
+        self.capacity = int(self._header[1])
+        self.readers = int(self._header[3])
+        if not 0 <= reader < self.readers:
+            self.close()
+            raise ValueError(f"Reader index must be in range 0..{self.readers - 1}")
+        self.reader = reader
+
+        header_size = self._header_size(self.readers)
+        self._counters = np.ndarray(
+            (1 + self.readers,), dtype=np.int64, buffer=mem, offset=(self._FIXED_WORDS - 1) * 8
+        )
+        if create:
+            self._counters[:] = 0
+        self.buffer = np.ndarray((self.capacity,), dtype=self.dtype, buffer=mem, offset=header_size)
+
+    def _open(self, name: Optional[str], path: Optional[str], size: int, create: bool):
+        """ Opens the backing segment and returns a writable buffer over it. """
+        if path is not None:
+            self.name = path
+            if create:
+                with open(path, "w+b") as file:
+                    file.truncate(size)
+            fd = os.open(path, os.O_RDWR)
+            try:
+                self._mmap = mmap.mmap(fd, 0)
+            finally:
+                os.close(fd)
+            return self._mmap
+
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            try:
+                # Attaching processes must not unlink the block when they exit (3.13+)
+                self._shm = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        return self._shm.buf
+
+    @classmethod
+    def _header_size(cls, readers: int) -> int:
+        """ Header size in bytes, rounded up to a cache line. """
+        return -(-(cls._FIXED_WORDS + readers) * 8 // 64) * 64
+
+    @property
+    def tail(self) -> int:
+        """ The total number of records written so far. """
+        return int(self._counters[0])
+
+    @property
+    def head(self) -> int:
+        """ The total number of records read so far by this consumer. """
+        return int(self._counters[1 + self.reader])
+
+    def qsize(self) -> int:
+        """ Returns the number of records this consumer has not read yet. """
+        return self.tail - self.head
+
+    def free(self) -> int:
+        """ Returns the number of records the producer can write without waiting. """
+        return self.capacity - (self.tail - int(self._counters[1:].min()))
+
+    def isEmpty(self) -> bool:
+        """ Checks if this consumer has no unread records. """
+        return self.qsize() == 0
+
+    def isFull(self) -> bool:
+        """ Checks if the producer has to wait for the slowest consumer. """
+        return self.free() == 0
+
+    def enBuffer(self, value) -> bool:
+        """
+        Enqueues a single record if there is room.
+
+        Parameters
+        ----------
+        value : scalar or tuple
+            The record to be added to the buffer.
+
+        Returns
+        -------
+        bool
+            True if the record was written, False if the buffer is full.
+
+        """
+        if self.free() == 0:
+            return False
+        tail = self.tail
+        self.buffer[tail % self.capacity] = value
+        self._counters[0] = tail + 1
+        return True
+
+    def extend(self, values) -> int:
+        """
+        Enqueues as many records as fit, with at most two slice copies.
+
+        Parameters
+        ----------
+        values : array_like
+            The records to be added to the buffer.
+
+        Returns
+        -------
+        int
+            The number of records written, starting from the first one.
+
+        """
+        values = np.asarray(values, dtype=self.dtype).reshape(-1)
+        n = min(len(values), self.free())
+        if n == 0:
+            return 0
+        tail = self.tail
+        start = tail % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = values[:first]
+        self.buffer[:n - first] = values[first:n]
+        self._counters[0] = tail + n
+        return n
+
+    def peek(self, n: int) -> np.ndarray:
+        """
+        Returns up to n unread records without copying or consuming them.
+
+        Only the contiguous part up to the physical end of the buffer is returned,
+        so the result may be shorter than the number of unread records. Call
+        advance() once the records are processed.
+
+        Parameters
+        ----------
+        n : int
+            The maximum number of records to return.
+
+        Returns
+        -------
+        numpy.ndarray
+            A view into the shared segment.
+
+        """
+        head = self.head
+        start = head % self.capacity
+        n = max(0, min(n, self.tail - head, self.capacity - start))
+        return self.buffer[start:start + n]
+
+    def advance(self, n: int) -> None:
+        """
+        Marks n records as read by this consumer, freeing them for the producer.
+
+        Parameters
+        ----------
+        n : int
+            The number of records to consume.
+
+        Raises
+        ------
+        ValueError
+            If n exceeds the number of unread records.
+
+        """
+        if n > self.qsize():
+            raise ValueError("Cannot advance past the last written record")
+        self._counters[1 + self.reader] = self.head + n
+
+    def pop_many(self, n: int) -> np.ndarray:
+        """
+        Copies out and consumes up to n unread records.
+
+        Parameters
+        ----------
+        n : int
+            The maximum number of records to remove.
+
+        Returns
+        -------
+        numpy.ndarray
+            The removed records, oldest first.
+
+        """
+        head = self.head
+        n = max(0, min(n, self.tail - head))
+        start = head % self.capacity
+        first = min(n, self.capacity - start)
+        result = np.empty(n, dtype=self.dtype)
+        result[:first] = self.buffer[start:start + first]
+        result[first:] = self.buffer[:n - first]
+        self._counters[1 + self.reader] = head + n
+        return result
+
+    def close(self) -> None:
+        """ Detaches from the shared segment. Views returned by peek become invalid. """
+        self._header = self._counters = self.buffer = None
+        if self._shm is not None:
+            self._shm.close()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def unlink(self) -> None:
+        """ Destroys the shared segment. Call once, from the creating process. """
+        if self._shm is not None:
+            self._shm.unlink()
+        elif self._mmap is not None and os.path.exists(self.name):
+            os.remove(self.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def benchmark_queues(items: int = 200_000, capacity: int = 1024) -> None:
+    """
+    Compare producer/consumer throughput of ConcurrentRingBuffer against
+    queue.Queue and collections.deque, with one producer and one consumer thread.
+
+    Parameters
+    ----------
+    items : int, optional
+        The number of items passed from producer to consumer. Defaults to 200 000.
+    capacity : int, optional
+        The capacity of the bounded queues. Defaults to 1024.
+
+    """
+    def run(put, get) -> float:
+        def produce():
+            for i in range(items):
+                put(i)
+
+        producer = threading.Thread(target=produce)
+        start = time.perf_counter()
+        producer.start()
+        for _ in range(items):
+            get()
+        producer.join()
+        return items / (time.perf_counter() - start)
+
+    spsc = ConcurrentRingBuffer(capacity)
+    mpsc = ConcurrentRingBuffer(capacity, multi_producer=True)
+    bounded = queue.Queue(capacity)
+    unbounded = deque()
+
+    def deque_get():
+        while True:
+            try:
+                return unbounded.popleft()
+            except IndexError:
+                time.sleep(0)
+
+    results = {
+        "ConcurrentRingBuffer (SPSC)": run(spsc.put, spsc.get),
+        "ConcurrentRingBuffer (multi-producer)": run(mpsc.put, mpsc.get),
+        "queue.Queue": run(bounded.put, bounded.get),
+        "collections.deque (unbounded)": run(unbounded.append, deque_get),
+    }
+    for name, rate in results.items():
+        print(f"{name:<40} {colored(f'{rate:>12,.0f}', 'cyan')} items/s")
+
+
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_queues()
+        sys.exit(0)
+
     try:
         capacity = int(input("Enter the capacity of the buffer: "))
         buffer = RingBuffer(capacity)
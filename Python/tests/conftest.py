@@ -0,0 +1,7 @@
+"""Make the scripts in the parent directory importable by the tests."""
+
+# Standard library imports
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+"""Tests for encoding_detector.py."""
+
+import encoding_detector
+
+
+def test_streaming_reads_past_the_detector_buffer(tmp_path):
+    path = tmp_path / 'late_accent.csv'
+    path.write_bytes(b'abc;def\n' * 37_500 + 'café;garçon\n'.encode('latin-1'))
+
+    result = encoding_detector.detect_encoding_streaming(str(path))
+
+    assert result.encoding != 'ascii'
+    assert result.bytes_read == path.stat().st_size
+
+
+def test_streaming_reports_the_bytes_examined(tmp_path):
+    path = tmp_path / 'ascii.csv'
+    path.write_bytes(b'abc;def\n' * 50_000)
+
+    result = encoding_detector.detect_encoding_streaming(str(path), max_bytes=100_000)
+
+    assert result.bytes_read == 100_000
+
+
+def test_cache_does_not_answer_a_stronger_mode(tmp_path):
+    path = tmp_path / 'large.csv'
+    path.write_bytes('café;garçon\n'.encode('latin-1') * 50_000)
+    cache_file = str(tmp_path / 'cache.json')
+
+    sampled = encoding_detector.detect_encodings(str(path), 1, 'sample', cache_file)[str(path)]
+    full = encoding_detector.detect_encodings(str(path), 1, 'full', cache_file)[str(path)]
+    cached = encoding_detector.detect_encodings(str(path), 1, 'stream', cache_file)[str(path)]
+
+    assert sampled.bytes_read < path.stat().st_size
+    assert full.bytes_read == path.stat().st_size
+    assert cached == full
+
+
+def test_transcode_files_keeps_a_weak_cp1250_guess(tmp_path):
+    text = 'CAS;Teplota venkovní;Stav\n' + '01.01.2024 00:00:00;-3,5;čerpadlo, vytápění, příprava TUV\n' * 200
+    path = tmp_path / 'export.csv'
+    path.write_bytes(text.encode('cp1250'))
+
+    result = encoding_detector.transcode_files(str(path), workers=1, cache_file=None)[str(path)]
+
+    assert result.error is None
+    assert result.encoding.lower() in ('windows-1250', 'cp1250')
+    assert (tmp_path / 'export.utf8.csv').read_text(encoding='utf-8') == text
@@ -0,0 +1,87 @@
+"""Tests for normalizer.py."""
+
+# Third-party imports
+import pandas as pd
+import pytest
+
+import normalizer
+
+ROWS = [
+    ('2024-01-01 00:00:03', 0.0, 20.5),
+    ('2024-01-01 00:00:17', 0.0, 21.0),
+    ('2024-01-01 00:00:41', 0.0, 22.5),
+    ('2024-01-01 00:01:00', 0.0, 23.0),
+]
+
+
+def _write_export(path, rows=ROWS, encoding=normalizer.ENCODING):
+    """Write a CSV export in the format of the heat pump logger: a title line, then the data."""
+    lines = ['Export', f'{normalizer.TIMESTAMP_COLUMN};{normalizer.COMPRESSOR_COLUMN};Teplota venkovní']
+    lines += [f'{stamp};{compressor};{temperature}' for stamp, compressor, temperature in rows]
+    path.write_text('\n'.join(lines) + '\n', encoding=encoding)
+
+
+def test_engines_return_identical_frames(tmp_path):
+    pytest.importorskip('pyarrow')
+    _write_export(tmp_path / 'export.csv')
+    name = str(tmp_path / 'export')
+
+    frames = [normalizer.interpolate_timestamp(name, schema=normalizer.CsvSchema(engine=engine))
+              for engine in (None, 'pyarrow')]
+
+    assert frames[1].index.dtype == 'datetime64[ns]'
+    pd.testing.assert_frame_equal(frames[0], frames[1])
+
+
+@pytest.mark.parametrize('engine', [None, 'pyarrow'])
+def test_numpy_resampler_matches_pandas(tmp_path, engine):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    _write_export(tmp_path / 'export.csv')
+    name = str(tmp_path / 'export')
+    schema = normalizer.CsvSchema(engine=engine)
+
+    expected = normalizer.interpolate_timestamp(name, schema=schema)
+    result = normalizer.interpolate_timestamp(name, schema=schema, resampler='numpy')
+
+    assert len(result) == 7
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_numpy_resampler_accepts_second_resolution_index():
+    index = pd.DatetimeIndex(['2024-01-01 00:00:03', '2024-01-01 00:00:41'], name='CAS').as_unit('s')
+    df = pd.DataFrame({'value': [1.0, 2.0]}, index=index)
+
+    result = normalizer._resample_numpy(df, 'ffill')
+
+    expected = df.set_axis(index.as_unit('ns')).resample(normalizer.INTERVAL).ffill()
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_join_weather_accepts_second_resolution_index():
+    start = 1704067200
+    weather = {'utc_offset_seconds': 0,
+               'hourly': {'time': [start, start + 3600, start + 7200], 'temperature_2m': [1.0, None, 3.0]}}
+    grid = pd.date_range('2024-01-01 00:30', '2024-01-01 01:30', freq='30min', name='CAS')
+    frames = {unit: {'site': pd.DataFrame({'value': 0.0}, index=grid.as_unit(unit))} for unit in ('ns', 's')}
+
+    joined = {unit: normalizer.join_weather(frame, {'site': weather}) for unit, frame in frames.items()}
+
+    assert list(joined['ns']['site']['temperature_2m']) == [1.5, 2.0, 2.5]
+    assert list(joined['s']['site']['temperature_2m']) == [1.5, 2.0, 2.5]
+
+
+def test_normalize_batch_reads_utf8_copies(tmp_path):
+    _write_export(tmp_path / 'transcoded.csv', encoding='cp1250')
+    _write_export(tmp_path / 'transcoded.utf8.csv', encoding='utf-8')
+    _write_export(tmp_path / 'latin.csv')
+
+    results = normalizer.normalize_batch(str(tmp_path), workers=1)
+
+    assert sorted(result.name for result in results) == [str(tmp_path / 'latin'), str(tmp_path / 'transcoded')]
+    assert not any(result.error for result in results)
+    assert sorted(path.name for path in tmp_path.glob('*_interpolated.csv')) == [
+        'latin_interpolated.csv', 'transcoded_interpolated.csv']
+    for name in ('latin', 'transcoded'):
+        header = (tmp_path / f'{name}_interpolated.csv').read_text(encoding='utf-8')
+        assert 'Teplota venkovní' in header.splitlines()[0]
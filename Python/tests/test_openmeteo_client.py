@@ -0,0 +1,31 @@
+"""Tests for openmeteo_client.py."""
+
+# Third-party imports
+import numpy as np
+
+import openmeteo_client
+
+
+def _response(start, hours):
+    times = [start + 3600 * hour for hour in range(hours)]
+    return {"latitude": 50.0, "longitude": 14.0,
+            "hourly": {"time": times, "temperature_2m": [float(hour) for hour in range(hours)]}}
+
+
+def test_interrupted_append_keeps_columns_aligned(tmp_path):
+    start = 1704067200
+    openmeteo_client.append_to_dataset(_response(start, 3), str(tmp_path), "site")
+    # Simulate a crash after the time column of the next append was written
+    with open(tmp_path / "site" / f"time{openmeteo_client.COLUMN_SUFFIX}", "ab") as column_file:
+        column_file.write(np.arange(3, 5, dtype="<i8").tobytes())
+
+    stored = openmeteo_client.load_site(str(tmp_path), "site")
+    assert len(stored["time"]) == len(stored["temperature_2m"]) == 3
+    del stored
+
+    appended = openmeteo_client.append_to_dataset(_response(start, 6), str(tmp_path), "site")
+    stored = openmeteo_client.load_site(str(tmp_path), "site")
+
+    assert appended == 3
+    assert list(stored["time"]) == [start + 3600 * hour for hour in range(6)]
+    assert list(stored["temperature_2m"]) == [float(hour) for hour in range(6)]